@@ -47,11 +47,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "app.querystats.QueryStatsMiddleware",
+    "app.slowqueries.SlowQueryMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "app.routers.ReplicaMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
@@ -81,6 +84,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "app.context_processors.admin_counters",
             ],
         },
     },
@@ -96,7 +100,43 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        # Reuse each thread's connection across requests for this many seconds
+        # (0 closes it after every request, None keeps it forever) ...
+        "CONN_MAX_AGE": config("CONN_MAX_AGE", default=600, cast=int),
+        # ... and check that a reused connection still works before a request
+        # uses it
+        "CONN_HEALTH_CHECKS": config("CONN_HEALTH_CHECKS", default=True, cast=bool),
+    },
+    # Read-only copy for admin analytics, refreshed by manage.py refresh_replica
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": config(
+            "REPLICA_DATABASE_NAME", default=BASE_DIR / "db_replica.sqlite3"
+        ),
+        "CONN_MAX_AGE": config("CONN_MAX_AGE", default=600, cast=int),
+        "CONN_HEALTH_CHECKS": config("CONN_HEALTH_CHECKS", default=True, cast=bool),
+        "TEST": {"MIRROR": "default"},
+    },
+}
+
+DATABASE_ROUTERS = ["app.routers.ReplicaRouter"]
+
+# Runs the tests against a throwaway cache (app/testrunner.py)
+TEST_RUNNER = "app.testrunner.TestRunner"
+
+# Seconds the replica may lag the primary before analytics reads fall back to
+# the primary; also how long a client that wrote keeps reading the primary
+REPLICA_MAX_LAG = config("REPLICA_MAX_LAG", default=300, cast=int)
+
+# Pragmas applied to every new SQLite connection (see app/sqlite.py for the
+# defaults). Unset variables keep the default.
+SQLITE_PRAGMAS = {
+    "journal_mode": config("SQLITE_JOURNAL_MODE", default=None),
+    "busy_timeout": config("SQLITE_BUSY_TIMEOUT", default=None),
+    "synchronous": config("SQLITE_SYNCHRONOUS", default=None),
+    "mmap_size": config("SQLITE_MMAP_SIZE", default=None),
+    "cache_size": config("SQLITE_CACHE_SIZE", default=None),
+    "temp_store": config("SQLITE_TEMP_STORE", default=None),
 }
 
 
@@ -141,11 +181,87 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")  # For production use
 
+# Cache shared by every worker process, so that invalidating a cached value
+# (revenue series, reports, public pages) reaches all of them. The
+# file-based backend needs no extra service; point CACHE_BACKEND and
+# CACHE_LOCATION at e.g. django.core.cache.backends.redis.RedisCache when the
+# workers run on several hosts.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=str(BASE_DIR / "cache")),
+    }
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Number of rows per page on the admin leads list
+LEADS_PAGE_SIZE = config("LEADS_PAGE_SIZE", default=50, cast=int)
+
+# Number of rows per page on the admin orders lists
+ORDERS_PAGE_SIZE = config("ORDERS_PAGE_SIZE", default=50, cast=int)
+
+# Number of rows per page on the admin projects list
+PROJECTS_PAGE_SIZE = config("PROJECTS_PAGE_SIZE", default=50, cast=int)
+
+# Where manage.py build_reports writes precomputed report snapshots
+REPORTS_SNAPSHOT_DIR = config(
+    "REPORTS_SNAPSHOT_DIR", default=os.path.join(BASE_DIR, "report_snapshots")
+)
+
+# manage.py archive_old_rows moves leads, quotes and messages older than this
+# many days into the archive tables
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", default=365, cast=int)
+
+# Local hours ("start-end", end exclusive, may wrap midnight) during which
+# manage.py purge_inactive_leads hard-deletes soft-deleted leads
+LEAD_PURGE_QUIET_HOURS = config("LEAD_PURGE_QUIET_HOURS", default="1-5")
+
+# Seconds anonymous visitors are served the public pages from the cache
+# (app.pagecache); 0 disables it. manage.py purge_page_cache drops them early.
+PAGE_CACHE_TIMEOUT = config("PAGE_CACHE_TIMEOUT", default=600, cast=int)
+
+# Per-request query instrumentation (app.querystats.QueryStatsMiddleware).
+# Samples are appended to QUERY_STATS_FILE and summarized by manage.py querystats.
+QUERY_STATS_ENABLED = config("QUERY_STATS_ENABLED", default=True, cast=bool)
+QUERY_STATS_FILE = config(
+    "QUERY_STATS_FILE", default=os.path.join(BASE_DIR, "logs", "query_stats.jsonl")
+)
+# Maximum queries per request, keyed by URL name. Views without an entry get
+# QUERY_BUDGET_DEFAULT. QUERY_BUDGET_ACTION is "log" or "raise".
+QUERY_BUDGETS = {
+    "home": 4,
+    "useradmin": 15,
+    "orders": 8,
+    "pending_orders": 8,
+    "revenue": 6,
+    "revenue_data": 4,
+    "reports": 8,
+    "reports_export": 8,
+    "admininbox": 8,
+    "adminleads": 6,
+    "adminquotes": 8,
+    "projects": 6,
+    "inbox": 8,
+}
+QUERY_BUDGET_DEFAULT = config("QUERY_BUDGET_DEFAULT", default=30, cast=int)
+QUERY_BUDGET_ACTION = config("QUERY_BUDGET_ACTION", default="log")
+
+# Statements slower than SLOW_QUERY_THRESHOLD_MS are appended to SLOW_QUERY_LOG
+# with their query plan (app.slowqueries.SlowQueryMiddleware) and grouped by
+# manage.py slowqueries.
+SLOW_QUERY_LOG_ENABLED = config("SLOW_QUERY_LOG_ENABLED", default=True, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config("SLOW_QUERY_THRESHOLD_MS", default=100, cast=float)
+SLOW_QUERY_LOG = config(
+    "SLOW_QUERY_LOG", default=os.path.join(BASE_DIR, "logs", "slow_queries.jsonl")
+)
+
 LOGIN_REDIRECT_URL = "/admin-login/"
 LOGOUT_REDIRECT_URL = "home"
 
@@ -156,8 +272,30 @@ LOGGING = {
         "console": {
             "class": "logging.StreamHandler",
         },
+        "query_stats": {
+            "class": "app.logs.JsonlFileHandler",
+            "filename": QUERY_STATS_FILE,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+        },
+        "slow_queries": {
+            "class": "app.logs.JsonlFileHandler",
+            "filename": SLOW_QUERY_LOG,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+        },
     },
     "loggers": {
+        "app.querystats.samples": {
+            "handlers": ["query_stats"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "app.slowqueries.entries": {
+            "handlers": ["slow_queries"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "django.template": {
             "handlers": ["console"],
             "level": "DEBUG",
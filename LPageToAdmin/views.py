@@ -1,13 +1,32 @@
+import logging
+
 from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
-from django.db.models import Count, Sum
-from django.db.models.functions import ExtractMonth
 from django.shortcuts import redirect, render
 from django.utils.timezone import now
 from django.views.decorators.csrf import csrf_protect
+from app.archive import archive_search
+from app.counters import get_counters
+from app.dashboard import dashboard_metrics, empty_dashboard_metrics
+from app.funnel import lead_funnel
+from app.inbox import bulk_delete_messages, bulk_set_read_status, select_messages
+from app.leads import intake_lead, soft_delete_leads
+from app.mail import enqueue_mail
 from app.models import Lead, Message, Order, Project, Quote, UserCreateForm
+from app.pagecache import cache_public_page, render_public_page
+from app.pagination import InvalidCursor, KeysetPage, keyset_paginate
+from app.projects import popular_window_styles, projects_page
+from app.reports import EXPORT_SECTIONS, export_rows, parse_report_range, stream_csv
+from app.snapshots import (
+    default_report,
+    find_snapshot,
+    get_report,
+    latest_snapshots,
+)
+from app.routers import read_from_replica
+from app.rollups import REVENUE_BUCKETS, order_count, revenue_series, sales_chart
+from app.search import search
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages  # Import the messages framework
 from django.contrib.auth.decorators import login_required
@@ -19,8 +38,17 @@ from django.shortcuts import get_object_or_404
 from django.core.paginator import Paginator
 from app.forms import QuoteForm
 from app.models import Quote
-from django.http import HttpResponse
-import csv
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
+
+logger = logging.getLogger(__name__)
 
 
 # Base Views
@@ -33,10 +61,11 @@ def ADMINBASE(request):
 
 
 # Home View
+@cache_public_page
 def HOME(request):
-    """Renders the homepage."""
+    """Renders the homepage, cached for anonymous visitors."""
     context = {"static_example": "/static/assets/img/testimonial-1.jpg"}
-    return render(request, "pages/index.html", context)
+    return render_public_page(request, "pages/index.html", context)
 
 
 # User Registration (Signup)
@@ -60,99 +89,49 @@ def signup(request):
 
 # Email Utility
 def send_quote_email(to_email, subject, message):
-    """Send a quote email using Django's send_mail function."""
-    send_mail(
-        subject,
-        message,
-        settings.EMAIL_HOST_USER,
-        [to_email],
-        fail_silently=False,
-    )
+    """Queue a quote email for run_mail_worker."""
+    enqueue_mail(subject, message, settings.EMAIL_HOST_USER, [to_email])
 
 
 @csrf_protect
 @login_required
+@read_from_replica
 def USERADMIN(request):
     """
     Admin Dashboard View - Displays key metrics, recent leads, and other statistics.
     """
     try:
         # Key Metrics
-        new_leads_count = Lead.objects.filter(status="new").count()
-        pending_orders_count = Order.objects.filter(status="pending").count()
-        completed_projects_count = Project.objects.filter(status="completed").count()
-        monthly_revenue = (
-            Order.objects.filter(date__month=now().month)
-            .aggregate(Sum("amount"))
-            .get("amount__sum", 0)
-            or 0
-        )
-        total_quotes = Quote.objects.count()
-        orders_in_progress = Order.objects.filter(status="in-progress").count()
-        sales_completed = Order.objects.filter(status="completed").count()
-
-        # Calculate Conversion Rate
-        total_leads = Lead.objects.count()
-        conversion_rate = (
-            round((sales_completed / total_leads) * 100, 2) if total_leads > 0 else 0
-        )
+        metrics = dashboard_metrics()
+
+        # Lead funnel over the last year of weekly cohorts
+        funnel = lead_funnel()
+        metrics["conversion_rate"] = funnel["totals"]["rates"]["converted"]
 
         # Popular Window Styles
-        popular_window_styles = (
-            Project.objects.values("window_style")
-            .annotate(style_count=Count("window_style"))
-            .order_by("-style_count")[:5]
-        )
+        window_styles = popular_window_styles()
 
-        # Sales Chart Data (Revenue by Month)
-        sales_data = (
-            Order.objects.annotate(month=ExtractMonth("date"))
-            .values("month")
-            .annotate(total=Sum("amount"))
-            .order_by("month")
-        )
-        sales_chart_labels = [f"Month {data['month']}" for data in sales_data]
-        sales_chart_data = [data["total"] for data in sales_data]
+        # Sales Chart Data (Revenue by Month, from the rollup table)
+        sales_chart_labels, sales_chart_data = sales_chart()
 
         # Recent Leads
-        recent_leads = Lead.objects.order_by("-created_at")[:5]
-
-        # Inbox Message Count
-        message_count = Message.objects.filter(
-            is_read=False
-        ).count()  # Example: Count unread messages
+        recent_leads = _leads_page_context(request, page_size=5)["leads"]
 
-    except Exception as e:
+    except Exception:
         # Log error and set default values
-        print(f"Error fetching data: {e}")
-        new_leads_count = 0
-        pending_orders_count = 0
-        completed_projects_count = 0
-        monthly_revenue = 0.0
-        total_quotes = 0
-        orders_in_progress = 0
-        sales_completed = 0
-        conversion_rate = 0
-        popular_window_styles = []
+        logger.exception("Error fetching dashboard data")
+        metrics = empty_dashboard_metrics()
+        funnel = None
+        window_styles = []
         sales_chart_labels = []
         sales_chart_data = []
         recent_leads = []
-        message_count = 0
 
     # Context for the template
     context = {
-        "metrics": {
-            "new_leads_count": new_leads_count,
-            "pending_orders_count": pending_orders_count,
-            "completed_projects_count": completed_projects_count,
-            "monthly_revenue": monthly_revenue,
-            "total_quotes": total_quotes,
-            "orders_in_progress": orders_in_progress,
-            "sales_completed": sales_completed,
-            "conversion_rate": conversion_rate,
-            "message_count": message_count,  # Added inbox message count
-        },
-        "popular_window_styles": popular_window_styles,
+        "metrics": metrics,
+        "funnel": funnel,
+        "popular_window_styles": window_styles,
         "sales_chart_labels": sales_chart_labels,
         "sales_chart_data": sales_chart_data,
         "leads": recent_leads,
@@ -162,6 +141,38 @@ def USERADMIN(request):
     return render(request, "adminPages/adminhome.html", context)
 
 
+def _leads_page_context(request, page_size=None):
+    """Build the keyset-paginated leads context from the after/before cursors."""
+    leads = Lead.objects.all()
+    page_size = page_size or settings.LEADS_PAGE_SIZE
+    query = request.GET.get("q", "").strip()
+    if query:
+        # Ranked full-text results are shown on a single page
+        page = KeysetPage(list(search(leads, query, limit=page_size)))
+        search_archive = bool(request.GET.get("archive"))
+        return {
+            "leads": page,
+            "page_obj": page,
+            "search_query": query,
+            "search_archive": search_archive,
+            "archived_leads": (
+                archive_search("leads", query, limit=page_size)
+                if search_archive
+                else None
+            ),
+        }
+    try:
+        page = keyset_paginate(
+            leads,
+            page_size,
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+        )
+    except InvalidCursor:
+        page = keyset_paginate(leads, page_size)
+    return {"leads": page, "page_obj": page, "search_query": query}
+
+
 # Sidebar Views
 @staff_member_required
 def admin_leads_view(request):
@@ -173,24 +184,162 @@ def admin_leads_view(request):
         service = request.POST.get("service")
 
         # Save the new lead
-        Lead.objects.create(name=name, email=email, phone=phone, service=service)
-        messages.success(request, "Lead successfully submitted!")
+        lead, created = intake_lead(
+            name=name, email=email, phone=phone, service=service
+        )
+        if created:
+            messages.success(request, "Lead successfully submitted!")
+        else:
+            messages.error(request, "This email has already been submitted.")
 
         # Redirect to the same page after form submission
         return redirect("adminPages/adminleads")
 
-    # Fetch all leads to display
-    leads = Lead.objects.all()
-    return render(request, "adminPages/adminleads.html", {"leads": leads})
+    # Fetch one page of leads to display
+    return render(request, "adminPages/adminleads.html", _leads_page_context(request))
 
 
+def _parse_revenue_date(value, default):
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError("Dates must be in YYYY-MM-DD format.")
+    return parsed
+
+
+def _revenue_params(params):
+    """
+    Parse the revenue range, bucket and status from query parameters.
+
+    Defaults to the trailing year in monthly buckets.
+    """
+    end = _parse_revenue_date(params.get("end"), now().date())
+    start = _parse_revenue_date(
+        params.get("start"), end.replace(year=end.year - 1, day=1)
+    )
+    bucket = params.get("bucket") or "month"
+    if bucket not in REVENUE_BUCKETS:
+        raise ValueError(f"Bucket must be one of: {', '.join(REVENUE_BUCKETS)}.")
+    if start > end:
+        raise ValueError("Start date must not be after end date.")
+    return start, end, bucket, params.get("status") or None
+
+
+@staff_member_required
+@read_from_replica
 def revenue_view(request):
     """
     Handles the revenue details view.
     """
-    # Example data for demonstration
-    revenue_data = [43300.33]  # Replace with your actual query or calculations
-    return render(request, "adminPages/revenue.html", {"revenue_data": revenue_data})
+    try:
+        start, end, bucket, status = _revenue_params(request.GET)
+    except ValueError as e:
+        messages.error(request, str(e))
+        start, end, bucket, status = _revenue_params({})
+    revenue_data = revenue_series(start, end, bucket, status)
+    context = {
+        "revenue_data": revenue_data,
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "buckets": list(REVENUE_BUCKETS),
+    }
+    return render(request, "adminPages/revenue.html", context)
+
+
+@staff_member_required
+@read_from_replica
+def revenue_data_view(request):
+    """
+    Returns the revenue time series for a date range as JSON.
+    """
+    try:
+        start, end, bucket, status = _revenue_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(
+        {
+            "start": start,
+            "end": end,
+            "bucket": bucket,
+            "status": status,
+            "series": revenue_series(start, end, bucket, status),
+        }
+    )
+
+
+ORDER_SORTS = {
+    "-date": "Newest first",
+    "date": "Oldest first",
+    "-amount": "Largest amount",
+    "amount": "Smallest amount",
+}
+
+
+def _orders_params(params, status=None):
+    """
+    Parse the status, date range and sort of the orders list from query
+    parameters. A ``status`` argument fixes the status regardless of them.
+    """
+    status = status or params.get("status") or None
+    if status and status not in dict(Order.STATUS_CHOICES):
+        raise ValueError("Unknown order status.")
+    start = _parse_revenue_date(params.get("start"), None)
+    end = _parse_revenue_date(params.get("end"), None)
+    if start and end and start > end:
+        raise ValueError("Start date must not be after end date.")
+    sort = params.get("sort") or "-date"
+    if sort not in ORDER_SORTS:
+        raise ValueError(f"Sort must be one of: {', '.join(ORDER_SORTS)}.")
+    return status, start, end, sort
+
+
+def _orders_page_context(request, status=None, view=None):
+    """
+    Build one keyset-paginated page of the filtered, sorted orders list.
+    ``view`` is carried on the page links so they stay on the same view.
+
+    The total comes from the DailyRevenue rollup rather than a count() over
+    Order.
+    """
+    try:
+        status, start, end, sort = _orders_params(request.GET, status)
+    except ValueError as e:
+        messages.error(request, str(e))
+        status, start, end, sort = _orders_params({}, status)
+    orders = Order.objects.all()
+    if status:
+        orders = orders.filter(status=status)
+    if start:
+        orders = orders.filter(date__gte=start)
+    if end:
+        orders = orders.filter(date__lte=end)
+    try:
+        page = keyset_paginate(
+            orders,
+            settings.ORDERS_PAGE_SIZE,
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+            ordering=sort,
+        )
+    except InvalidCursor:
+        page = keyset_paginate(orders, settings.ORDERS_PAGE_SIZE, ordering=sort)
+    filters = {"status": status, "start": start, "end": end, "sort": sort}
+    return {
+        "orders": page,
+        "page_obj": page,
+        "orders_count": order_count(start, end, status),
+        "filters": filters,
+        "filter_query": urlencode(
+            {k: v for k, v in {"view": view, **filters}.items() if v}
+        ),
+        "statuses": Order.STATUS_CHOICES,
+        "sorts": ORDER_SORTS,
+    }
 
 
 def pending_orders_view(request):
@@ -200,22 +349,10 @@ def pending_orders_view(request):
     if not request.user.is_staff:  # Ensure only staff/admin users can access
         return redirect("admin:login")
 
-    # Query the database for pending orders
-    pending_orders = Order.objects.filter(
-        status="pending"
-    )  # Adjust status value as needed
-    pending_orders_count = pending_orders.count()  # Count pending orders
-
-    # Pass data to the shared adminorders.html template
-    return render(
-        request,
-        "adminPages/adminorders.html",
-        {
-            "orders": pending_orders,  # Use orders for compatibility with existing template
-            "pending_orders_count": pending_orders_count,
-            "view_mode": "pending",  # Used to differentiate views in the template
-        },
-    )
+    context = _orders_page_context(request, status="pending")
+    context["pending_orders_count"] = context["orders_count"]
+    context["view_mode"] = "pending"  # Used to differentiate views in the template
+    return render(request, "adminPages/adminorders.html", context)
 
 
 @csrf_protect
@@ -229,24 +366,17 @@ def orders_view(request):
     # Get the filter type from the query parameter
     view_mode = request.GET.get("view", "all")  # Default to 'all'
 
-    if view_mode == "pending":
-        orders = Order.objects.filter(status="pending")  # Filter for pending orders
-        pending_orders_count = orders.count()
-    else:
-        orders = Order.objects.all()  # Fetch all orders
-        pending_orders_count = None
-
-    # Pass the orders and metrics to the template
-    return render(
+    pending = view_mode == "pending"
+    context = _orders_page_context(
         request,
-        "adminPages/adminorders.html",
-        {
-            "orders": orders,
-            "view_mode": view_mode,
-            "pending_orders_count": pending_orders_count,
-        },
+        status="pending" if pending else None,
+        view="pending" if pending else None,
     )
-
+    context["view_mode"] = view_mode
+    context["pending_orders_count"] = (
+        context["orders_count"] if view_mode == "pending" else None
+    )
+    return render(request, "adminPages/adminorders.html", context)
 
 
 def view_order(request, id):
@@ -258,49 +388,113 @@ def view_order(request, id):
 
 
 def projects_view(request):
-    projects = Project.objects.all()
-    return render(request, "adminPages/adminprojects.html", {"projects": projects})
+    status = request.GET.get("status")
+    if status not in dict(Project._meta.get_field("status").choices):
+        status = None
+    projects = projects_page(
+        settings.PROJECTS_PAGE_SIZE,
+        status,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+    context = {
+        "projects": projects,
+        "page_obj": projects,
+        "status": status,
+        "statuses": Project._meta.get_field("status").choices,
+    }
+    return render(request, "adminPages/adminprojects.html", context)
 
 
+@staff_member_required
+@read_from_replica
 def reports_view(request):
-    """Handles generating reports."""
-    return render(request, "adminPages/adminreports.html")
+    """Handles generating reports for the requested date range."""
+    try:
+        start, end = parse_report_range(request.GET)
+    except ValueError as e:
+        messages.error(request, str(e))
+        start, end = None, None
+    if start is None and end is None and not request.GET.get("all"):
+        # The newest snapshot rather than the all-time report
+        context = default_report()
+    else:
+        context = get_report(start, end)
+    context.setdefault("start", start)
+    context.setdefault("end", end)
+    context["snapshots"] = latest_snapshots()
+    return render(request, "adminPages/adminreports.html", context)
 
 
+@staff_member_required
 def reports_export(request):
     """
-    Export reports to CSV format.
+    Stream the orders, leads and quotes in the requested range as CSV.
+
+    ``type`` limits the export to one of orders, leads or quotes. Ranges with
+    a build_reports snapshot are served from disk.
     """
-    # Example report data (replace this with actual query)
-    report_data = [
-        {"title": "Report 1", "details": "Details of Report 1", "created_at": "2024-12-17"},
-        {"title": "Report 2", "details": "Details of Report 2", "created_at": "2024-12-18"},
-    ]
-
-    # Create the HttpResponse object with CSV headers
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="reports.csv"'
-
-    # Write data to CSV
-    writer = csv.writer(response)
-    writer.writerow(["Title", "Details", "Created At"])  # CSV Header
-    for report in report_data:
-        writer.writerow([report["title"], report["details"], report["created_at"]])
+    try:
+        start, end = parse_report_range(request.GET)
+    except ValueError as e:
+        return HttpResponse(str(e), status=400)
+    section = request.GET.get("type")
+    if section and section not in EXPORT_SECTIONS:
+        return HttpResponse(
+            f"Type must be one of: {', '.join(EXPORT_SECTIONS)}.", status=400
+        )
 
+    filename = "_".join(
+        ["reports", section or "all", *(str(day) for day in (start, end) if day)]
+    )
+    snapshot = None if section else find_snapshot(start, end, "csv")
+    if snapshot:
+        try:
+            handle = open(snapshot, "rb")
+        except FileNotFoundError:
+            # Pruned by build_reports since it was found; export it live
+            pass
+        else:
+            return FileResponse(
+                handle,
+                as_attachment=True,
+                filename=f"{filename}.csv",
+                content_type="text/csv",
+            )
+    response = StreamingHttpResponse(
+        stream_csv(export_rows(start, end, [section] if section else None)),
+        content_type="text/csv",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
     return response
 
 
 # Admin Inbox View
 @staff_member_required
+@read_from_replica
 def admin_inbox(request):
     messages = Message.objects.all().order_by("-created_at")  # Ordered messages
     leads = Lead.objects.all().order_by("-created_at")  # Ordered leads
-
+    query = request.GET.get("q", "").strip()
+    # The archive is only searched when explicitly requested
+    search_archive = bool(query and request.GET.get("archive"))
+    if query:
+        messages = search(messages, query)  # Ranked full-text matches
+        leads = search(leads, query)
+
+    counters = get_counters()
     context = {
         "messages": messages,
         "leads": leads,
-        "message_count": messages.count(),  # Total messages
-        "lead_count": leads.count(),  # Total leads
+        "archived_messages": (
+            archive_search("messages", query) if search_archive else None
+        ),
+        "archived_leads": archive_search("leads", query) if search_archive else None,
+        # Totals include archived rows
+        "message_count": counters["total_messages"] + counters["archived_messages"],
+        "lead_count": counters["total_leads"] + counters["archived_leads"],
+        "search_query": query,
+        "search_archive": search_archive,
     }
     return render(request, "adminPages/admininbox.html", context)
 
@@ -317,8 +511,11 @@ def quick_lead_view(request):
     if request.method == "POST":
         email = request.POST.get("email")
         try:
-            Lead.objects.create(email=email, name="Anonymous")
-            messages.success(request, "Your email has been submitted successfully!")
+            lead, created = intake_lead(email=email, name="Anonymous")
+            if created:
+                messages.success(request, "Your email has been submitted successfully!")
+            else:
+                messages.error(request, "This email has already been submitted.")
         except Exception as e:
             messages.error(request, "An error occurred. Please try again.")
     return render(request, "user_landing.html")  # Ensure this template exists
@@ -333,10 +530,9 @@ def view_message(request, message_id):
     # Retrieve the message by its ID or return 404 if not found
     message = get_object_or_404(Message, id=message_id)
 
-    # Mark the message as read
+    # Mark the message as read (updates only the is_read column)
     if not message.is_read:
-        message.is_read = True
-        message.save()
+        message.mark_as_read()
 
     # Render the message detail template
     return render(request, "adminPages/adminmessage_detail.html", {"message": message})
@@ -364,27 +560,25 @@ def admin_submit_lead(request):
             messages.error(request, "Invalid phone number format.")
             return redirect("adminleads")
 
-        # Check for duplicate email
-        if Lead.objects.filter(email=email).exists():
-            messages.error(request, "This email has already been submitted.")
-        else:
-            try:
-                # Save the lead to the database
-                Lead.objects.create(name=name, email=email, phone=phone)
+        try:
+            # Save the lead; the unique email index rejects duplicates
+            lead, created = intake_lead(name=name, email=email, phone=phone)
+            if created:
                 messages.success(request, "Lead submitted successfully!")
-            except Exception as e:
-                print(f"Error saving lead: {str(e)}")
-                messages.error(
-                    request,
-                    "An error occurred while saving the lead. Please try again.",
-                )
+            else:
+                messages.error(request, "This email has already been submitted.")
+        except Exception as e:
+            print(f"Error saving lead: {str(e)}")
+            messages.error(
+                request,
+                "An error occurred while saving the lead. Please try again.",
+            )
 
         # Redirect back to the admin leads page
         return redirect("adminleads")
 
-    # Render the admin leads page with all leads
-    leads = Lead.objects.all().order_by("-created_at")
-    return render(request, "adminPages/adminleads.html", {"leads": leads})
+    # Render the admin leads page with one page of leads
+    return render(request, "adminPages/adminleads.html", _leads_page_context(request))
 
 
 @csrf_protect
@@ -403,9 +597,25 @@ def admin_quotes_view(request, quote_id=None):
         quote = get_object_or_404(Quote, id=quote_id)
         return render(request, "adminPages/adminquotes.html", {"quote": quote})
 
-    # List all quotes
+    # List all quotes, or ranked full-text matches when searching
     quotes = Quote.objects.all()
-    return render(request, "adminPages/adminquotes.html", {"quotes": quotes, "form": QuoteForm()})
+    query = request.GET.get("q", "").strip()
+    search_archive = bool(query and request.GET.get("archive"))
+    if query:
+        quotes = search(quotes, query)
+    return render(
+        request,
+        "adminPages/adminquotes.html",
+        {
+            "quotes": quotes,
+            "archived_quotes": (
+                archive_search("quotes", query) if search_archive else None
+            ),
+            "form": QuoteForm(),
+            "search_query": query,
+            "search_archive": search_archive,
+        },
+    )
     
 
 def edit_order(request, id):
@@ -434,12 +644,50 @@ def delete_message(request, message_id):
         messages.error(request, "You do not have permission to delete this message.")
         return redirect("inbox")
 
-    message = get_object_or_404(Message, id=message_id)
-    message.delete()
+    if not bulk_delete_messages(Message.objects.filter(id=message_id)):
+        raise Http404("Message not found.")
     messages.success(request, "Message deleted successfully.")
     return redirect("inbox")
 
 
+@staff_member_required
+@csrf_protect
+def bulk_messages_view(request):
+    """
+    Mark read, mark unread or delete many messages with a single statement.
+
+    The selection is either the checked ``ids`` or a filter on ``sender`` and
+    ``before``/``after`` dates. Answers with JSON when ``format=json``.
+    """
+    if request.method != "POST":
+        return redirect("admininbox")
+
+    wants_json = request.POST.get("format") == "json"
+    action = request.POST.get("action")
+    try:
+        if action not in ("mark_read", "mark_unread", "delete"):
+            raise ValueError("Unknown bulk action.")
+        selection = select_messages(request.POST)
+    except ValueError as e:
+        if wants_json:
+            return JsonResponse({"error": str(e)}, status=400)
+        messages.error(request, str(e))
+        return redirect("admininbox")
+
+    if action == "delete":
+        affected = bulk_delete_messages(selection)
+        summary = f"Deleted {affected} message(s)."
+    else:
+        affected = bulk_set_read_status(selection, is_read=action == "mark_read")
+        state = "read" if action == "mark_read" else "unread"
+        summary = f"Marked {affected} message(s) as {state}."
+
+    if wants_json:
+        return JsonResponse({"action": action, "affected": affected})
+    messages.success(request, summary)
+    return redirect("admininbox")
+
+
 def order_delete(request, order_id):
     """
     Deletes a specific order by ID and redirects to the orders list.
@@ -457,12 +705,12 @@ def order_delete(request, order_id):
 @staff_member_required
 def delete_lead(request, lead_id):
     """
-    Deletes a lead by its ID.
+    Soft-deletes a lead by its ID; purge_inactive_leads removes it later.
     """
     try:
         # Fetch the lead or raise a 404 error if it doesn't exist
         lead = get_object_or_404(Lead, id=lead_id)
-        lead.delete()  # Delete the lead
+        soft_delete_leads(Lead.objects.filter(pk=lead.pk))
         messages.success(request, "Lead deleted successfully!")
     except Exception as e:
         # Handle any exceptions (e.g., lead not found or database errors)
@@ -1,5 +1,15 @@
 from django.contrib import admin
 from .models import Lead, Order, Project, Quote  # No need to add 'app'
+from .search import search_filter
+
+
+class FullTextSearchMixin:
+    """Answer the admin search box from the FTS5 index instead of LIKE scans."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_filter(queryset, search_term), False
 
 
 # Register your models here.
@@ -18,13 +28,13 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(Quote)
-class QuoteAdmin(admin.ModelAdmin):
+class QuoteAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("name", "email", "phone", "created_at")
-    search_fields = ("name", "email")
+    search_fields = ("name", "email", "details")  # Indexed in app_quote_fts
 
 
 @admin.register(Lead)
-class LeadAdmin(admin.ModelAdmin):
+class LeadAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = (
         "id",
         "name",
@@ -39,5 +49,20 @@ class LeadAdmin(admin.ModelAdmin):
         "status",
         "service",
         "created_at",
+        "is_active",
     )  # Added 'service' for filtering by type of service
-    search_fields = ("name", "email", "phone", "service")  # Remains unchanged
+    search_fields = ("name", "email", "phone", "service")  # Indexed in app_lead_fts
+
+    def get_queryset(self, request):
+        # Include soft-deleted leads so they can be restored
+        return Lead.all_objects.all()
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        # Soft-deleted leads are dropped from app_lead_fts; match them with LIKE
+        active = search_filter(queryset.filter(is_active=True), search_term)
+        inactive, _ = admin.ModelAdmin.get_search_results(
+            self, request, queryset.filter(is_active=False), search_term
+        )
+        return active | inactive, False
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .bulk import delete_rows
+from .counters import adjust_counter
+from .models import ArchivedLead, ArchivedMessage, ArchivedQuote, Lead, Message, Quote
+from .search import SEARCH_FIELDS, SEARCH_LIMIT, build_match_query, unindex_queryset
+
+# Hot model and the archive table its old rows are moved into
+ARCHIVES = {
+    "leads": (Lead, ArchivedLead),
+    "quotes": (Quote, ArchivedQuote),
+    "messages": (Message, ArchivedMessage),
+}
+# Counter holding the number of archived rows of each kind
+ARCHIVE_COUNTERS = {
+    "leads": "archived_leads",
+    "quotes": "archived_quotes",
+    "messages": "archived_messages",
+}
+# Hot counters that lose an archived row, and which rows they count
+HOT_COUNTERS = {
+    "leads": {
+        "total_leads": lambda row: True,
+        "new_leads": lambda row: row["status"] == "new",
+    },
+    "quotes": {},
+    "messages": {
+        "total_messages": lambda row: True,
+        "unread_messages": lambda row: not row["is_read"],
+    },
+}
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_cutoff(days=None):
+    """Rows created before this moment are archived."""
+    return now() - timedelta(
+        days=settings.ARCHIVE_AFTER_DAYS if days is None else days
+    )
+
+
+def archivable(name, cutoff):
+    """
+    The hot rows of ``name`` that the cutoff would archive. Soft-deleted
+    leads are left for purge_inactive_leads.
+    """
+    model, _ = ARCHIVES[name]
+    return model._default_manager.filter(created_at__lt=cutoff)
+
+
+def archive_batch(name, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move the oldest ``batch_size`` rows created before ``cutoff`` into the
+    archive table in one transaction, keeping their primary keys.
+
+    The rows are deleted with a single DELETE, so the search index and the
+    counters are adjusted here instead of by signals. Returns the number of
+    rows moved.
+    """
+    model, archive = ARCHIVES[name]
+    fields = [field.attname for field in model._meta.concrete_fields]
+    with transaction.atomic():
+        rows = list(
+            archivable(name, cutoff)
+            .order_by("created_at", "id")
+            .values(*fields)[:batch_size]
+        )
+        if not rows:
+            return 0
+        archive.objects.bulk_create([archive(**row) for row in rows])
+        batch = model._default_manager.filter(pk__in=[row["id"] for row in rows])
+        unindex_queryset(batch)
+        delete_rows(batch)
+        for counter, counts in HOT_COUNTERS[name].items():
+            adjust_counter(counter, -sum(1 for row in rows if counts(row)))
+        adjust_counter(ARCHIVE_COUNTERS[name], len(rows))
+    return len(rows)
+
+
+def archive_search(name, term, limit=SEARCH_LIMIT):
+    """
+    Archived rows of ``name`` matching ``term``, newest first.
+
+    The archive has no full-text index, so this is a LIKE scan over the
+    hot model's search fields and only runs when an admin asks for it.
+    """
+    model, archive = ARCHIVES[name]
+    if not build_match_query(term):
+        return archive.objects.none()
+    condition = reduce(
+        or_, (Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS[model])
+    )
+    return archive.objects.filter(condition)[:limit]
@@ -0,0 +1,27 @@
+from django.db import connections, router
+
+
+def delete_rows(queryset):
+    """
+    Delete the rows of ``queryset`` with a single DELETE statement and return
+    how many were removed.
+
+    Unlike QuerySet.delete() no row is loaded, so no signals are sent and no
+    cascades are collected; callers adjust counters and indexes themselves.
+    The selection is compiled with Query.sql_with_params(), which Django has
+    kept stable through 4.1, and wrapped in ``DELETE ... WHERE pk IN (...)``.
+    Recheck both when upgrading Django or moving off SQLite (MySQL rejects a
+    subquery on the table being deleted from).
+    """
+    model = queryset.model
+    db = router.db_for_write(model)
+    connection = connections[db]
+    select_sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    quote_name = connection.ops.quote_name
+    sql = (
+        f"DELETE FROM {quote_name(model._meta.db_table)} "
+        f"WHERE {quote_name(model._meta.pk.column)} IN ({select_sql})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
@@ -0,0 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+
+from .counters import get_counters
+
+
+def admin_counters(request):
+    """
+    Badge counts for the admin templates, read from the Counter table.
+
+    The lookup is lazy, so pages that never show a badge make no query.
+    """
+    counters = SimpleLazyObject(get_counters)
+    return {
+        "counters": counters,
+        "unread_messages": SimpleLazyObject(lambda: counters["unread_messages"]),
+    }
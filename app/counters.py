@@ -0,0 +1,46 @@
+from django.db.models import F
+
+from .models import ArchivedLead, ArchivedMessage, ArchivedQuote, Counter, Lead, Message
+
+# How each counter is computed from scratch, for seeding and reconciliation
+COUNTER_QUERIES = {
+    "total_leads": lambda: Lead.objects.count(),
+    "new_leads": lambda: Lead.objects.filter(status="new").count(),
+    "total_messages": lambda: Message.objects.count(),
+    "unread_messages": lambda: Message.objects.filter(is_read=False).count(),
+    # Rows moved out by app.archive, added to the hot totals on the dashboard
+    "archived_leads": lambda: ArchivedLead.objects.count(),
+    "archived_quotes": lambda: ArchivedQuote.objects.count(),
+    "archived_messages": lambda: ArchivedMessage.objects.count(),
+}
+
+
+def adjust_counter(name, delta):
+    """Atomically add ``delta`` to a counter, seeding it if it does not exist."""
+    if not delta:
+        return
+    updated = Counter.objects.filter(name=name).update(value=F("value") + delta)
+    if not updated:
+        reconcile_counters([name])
+
+
+def get_counters():
+    """All counter values in one query, with missing counters reconciled."""
+    values = dict(Counter.objects.values_list("name", "value"))
+    missing = [name for name in COUNTER_QUERIES if name not in values]
+    if missing:
+        values.update(reconcile_counters(missing))
+    return values
+
+
+def reconcile_counters(names=None):
+    """
+    Recompute counters from the source tables and store them.
+
+    Returns ``{name: value}`` for the reconciled counters.
+    """
+    values = {}
+    for name in names or COUNTER_QUERIES:
+        values[name] = COUNTER_QUERIES[name]()
+        Counter.objects.update_or_create(name=name, defaults={"value": values[name]})
+    return values
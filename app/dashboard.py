@@ -0,0 +1,55 @@
+from django.db.models import Count, Q
+from django.utils.timezone import now
+
+from .counters import get_counters
+from .models import Order, Project, Quote
+from .rollups import monthly_revenue
+
+
+def dashboard_metrics():
+    """
+    Compute the admin dashboard metrics.
+
+    Lead, message and archived quote counts are read from the Counter table
+    and monthly revenue from the MonthlyRevenue rollup, not the source
+    tables. Order statuses are counted in one aggregate query, completed
+    projects and hot quotes with a count() each. Totals include the rows
+    moved to the archive by app.archive. The conversion rate is not part of
+    the result; USERADMIN adds it from app.funnel.lead_funnel().
+    """
+    today = now().date()
+
+    counters = get_counters()
+    order_totals = Order.objects.aggregate(
+        pending_orders_count=Count("id", filter=Q(status="pending")),
+        orders_in_progress=Count("id", filter=Q(status="in-progress")),
+        sales_completed=Count("id", filter=Q(status="completed")),
+    )
+    completed_projects_count = Project.objects.filter(status="completed").count()
+    total_quotes = Quote.objects.count() + counters["archived_quotes"]
+
+    return {
+        "new_leads_count": counters["new_leads"],
+        "pending_orders_count": order_totals["pending_orders_count"],
+        "completed_projects_count": completed_projects_count,
+        "monthly_revenue": monthly_revenue(today.year, today.month),
+        "total_quotes": total_quotes,
+        "orders_in_progress": order_totals["orders_in_progress"],
+        "sales_completed": order_totals["sales_completed"],
+        "message_count": counters["unread_messages"],
+    }
+
+
+def empty_dashboard_metrics():
+    """Fallback metrics used when the dashboard queries fail."""
+    return {
+        "new_leads_count": 0,
+        "pending_orders_count": 0,
+        "completed_projects_count": 0,
+        "monthly_revenue": 0.0,
+        "total_quotes": 0,
+        "orders_in_progress": 0,
+        "sales_completed": 0,
+        "conversion_rate": 0,
+        "message_count": 0,
+    }
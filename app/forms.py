@@ -2,6 +2,7 @@ from django import forms
 from .models import Lead, Message, Quote  # Import your models here
 from .models import Order
 from app.models import Lead  # Ensure this imports the correct Lead model
+from .leads import normalize_lead_email
 
 
 class LeadForm(forms.ModelForm):
@@ -10,10 +11,8 @@ class LeadForm(forms.ModelForm):
         fields = ["name", "email", "phone"]  # Specify fields to include in the form
 
     def clean_email(self):
-        email = self.cleaned_data.get("email")
-        if Lead.objects.filter(email=email).exists():
-            raise forms.ValidationError("This email has already been submitted.")
-        return email
+        # Duplicates are rejected by the model's unique_lead_email_ci constraint
+        return normalize_lead_email(self.cleaned_data.get("email"))
 
     def clean_phone(self):
         phone = self.cleaned_data.get("phone")  # Fetch the phone field value
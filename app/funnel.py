@@ -0,0 +1,104 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncWeek
+from django.utils.timezone import localdate, make_aware
+
+from .models import Lead
+
+# Funnel stages in order; a lead at a later stage has passed the earlier ones
+FUNNEL_STAGES = tuple(status for status, _ in Lead.STATUSES)
+FUNNEL_WEEKS = 52
+
+
+def _add(a, b):
+    return [x + y for x, y in zip(a, b)]
+
+
+def _summary(counts):
+    """
+    Turn per-stage lead counts into the number of leads that reached each
+    stage and the rate at which they did.
+    """
+    reached = []
+    total = 0
+    for count in reversed(counts):
+        total += count
+        reached.append(total)
+    reached.reverse()
+    leads = reached[0]
+    return {
+        "leads": leads,
+        **{stage: reached[i] for i, stage in enumerate(FUNNEL_STAGES) if i},
+        "rates": {
+            stage: round(reached[i] * 100 / leads, 2) if leads else 0
+            for i, stage in enumerate(FUNNEL_STAGES)
+            if i
+        },
+    }
+
+
+def lead_funnel(weeks=FUNNEL_WEEKS, today=None):
+    """
+    Lead funnel over the trailing ``weeks`` weekly cohorts (by created_at),
+    overall, per service and per cohort.
+
+    A single GROUP BY query counts the leads in range per service, week
+    and status (a few hundred rows at most) into a (service, week, stage)
+    count grid; every total is then a sum over one axis of that grid.
+    """
+    today = today or localdate()
+    first_week = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    stage_index = {stage: i for i, stage in enumerate(FUNNEL_STAGES)}
+    empty = [0] * len(FUNNEL_STAGES)
+
+    def new_grid():
+        return [list(empty) for _ in range(weeks)]
+
+    grid = {service: new_grid() for service, _ in Lead.SERVICES}
+    rows = (
+        Lead._default_manager.filter(
+            created_at__gte=make_aware(datetime.combine(first_week, time.min))
+        )
+        # Monday-based weeks in the current time zone, like first_week
+        .annotate(week=TruncWeek("created_at", output_field=DateField()))
+        .values("service", "week", "status")
+        .annotate(count=Count("id"))
+        .order_by()
+        .values_list("service", "week", "status", "count")
+    )
+    for service, week_start, status, count in rows:
+        week = (week_start - first_week).days // 7
+        if week < weeks:
+            cells = grid.get(service) or grid.setdefault(service, new_grid())
+            cells[week][stage_index.get(status, 0)] += count
+
+    labels = dict(Lead.SERVICES)
+    by_week = [list(empty) for _ in range(weeks)]
+    by_service = {}
+    for service, cells in grid.items():
+        by_service[service] = list(empty)
+        for week, counts in enumerate(cells):
+            by_week[week] = _add(by_week[week], counts)
+            by_service[service] = _add(by_service[service], counts)
+
+    return {
+        "stages": FUNNEL_STAGES,
+        "totals": _summary(
+            [sum(counts[i] for counts in by_week) for i in range(len(empty))]
+        ),
+        "services": {
+            service: {"label": labels.get(service, service), **_summary(counts)}
+            for service, counts in by_service.items()
+        },
+        "cohorts": [
+            {
+                "week": first_week + timedelta(weeks=week),
+                **_summary(counts),
+                "services": {
+                    service: _summary(cells[week]) for service, cells in grid.items()
+                },
+            }
+            for week, counts in enumerate(by_week)
+        ],
+    }
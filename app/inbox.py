@@ -0,0 +1,74 @@
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware
+
+from .bulk import delete_rows
+from .counters import adjust_counter
+from .models import Message
+from .search import unindex_queryset
+
+
+def select_messages(params):
+    """
+    Build the message selection for a bulk action from request parameters.
+
+    ``ids`` selects messages explicitly; ``sender``, ``before`` and ``after``
+    (YYYY-MM-DD) select by filter. Raises ValueError when nothing is selected
+    so an empty form can never act on the whole inbox.
+    """
+    queryset = Message.objects.all()
+    selected = False
+    ids = [int(pk) for pk in params.getlist("ids") if str(pk).isdigit()]
+    if ids:
+        queryset = queryset.filter(pk__in=ids)
+        selected = True
+    if params.get("sender"):
+        queryset = queryset.filter(sender=params["sender"])
+        selected = True
+    for name, lookup in (("before", "created_at__lt"), ("after", "created_at__gte")):
+        if params.get(name):
+            day = parse_date(params[name])
+            if day is None:
+                raise ValueError("Dates must be in YYYY-MM-DD format.")
+            # Compare against midnight so the created_at index can be used
+            queryset = queryset.filter(
+                **{lookup: make_aware(datetime.combine(day, time.min))}
+            )
+            selected = True
+    if not selected:
+        raise ValueError("Select messages or enter a filter first.")
+    return queryset
+
+
+def bulk_set_read_status(queryset, is_read=True):
+    """Mark every selected message read or unread with one UPDATE."""
+    with transaction.atomic():
+        changed = (
+            queryset.filter(is_read=not is_read).order_by().update(is_read=is_read)
+        )
+        adjust_counter("unread_messages", -changed if is_read else changed)
+    return changed
+
+
+def bulk_delete_messages(queryset):
+    """
+    Delete every selected message with one DELETE.
+
+    QuerySet.delete() would load each row to send signals, so the counters
+    and search index are adjusted here instead.
+    """
+    queryset = queryset.order_by()
+    with transaction.atomic():
+        totals = queryset.aggregate(
+            total=Count("id"), unread=Count("id", filter=Q(is_read=False))
+        )
+        if not totals["total"]:
+            return 0
+        unindex_queryset(queryset)
+        deleted = delete_rows(queryset)
+        adjust_counter("total_messages", -totals["total"])
+        adjust_counter("unread_messages", -totals["unread"])
+    return deleted
@@ -0,0 +1,94 @@
+from django.contrib.auth.base_user import BaseUserManager
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils.timezone import localdate
+
+from .bulk import delete_rows
+from .counters import adjust_counter
+from .models import ArchivedLead, Lead
+from .reports import invalidate_reports
+from .search import unindex_queryset
+
+DUPLICATE_EMAIL_CONSTRAINT = "unique_lead_email_ci"
+LEAD_PURGE_BATCH_SIZE = 500
+
+
+def normalize_lead_email(email):
+    """Strip whitespace and lowercase the domain part of an email address."""
+    return BaseUserManager.normalize_email((email or "").strip())
+
+
+def archived_emails(emails):
+    """The lowercased ``emails`` that belong to archived leads."""
+    return set(
+        ArchivedLead.objects.annotate(email_key=Lower("email"))
+        .filter(email_key__in=[email.lower() for email in emails])
+        .order_by()
+        .values_list("email_key", flat=True)
+    )
+
+
+def intake_lead(**fields):
+    """
+    Insert a lead with a single INSERT and let the case-insensitive unique
+    email index reject duplicates. Archived leads are outside that index and
+    are not looked up, so a lead archived a year ago can submit again;
+    import_leads still skips archived emails.
+
+    Returns ``(lead, True)`` for a new lead and ``(None, False)`` when the
+    email has already been submitted.
+    """
+    fields["email"] = normalize_lead_email(fields.get("email"))
+    try:
+        with transaction.atomic():
+            return Lead.objects.create(**fields), True
+    except IntegrityError as e:
+        if DUPLICATE_EMAIL_CONSTRAINT in str(e):
+            return None, False
+        raise
+
+
+def soft_delete_leads(queryset):
+    """
+    Mark the active leads of ``queryset`` inactive with one UPDATE.
+
+    The rows stay in place until purge_inactive_leads removes them, so a
+    delete costs no index rebalancing on the hot table. The update skips the
+    model signals, so the counters, search index and cached reports are
+    adjusted here. Returns the number of leads deactivated.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(is_active=True)
+            .order_by()
+            .values_list("pk", "status", "created_at")
+        )
+        if not rows:
+            return 0
+        batch = Lead.all_objects.filter(pk__in=[pk for pk, _, _ in rows])
+        unindex_queryset(batch)
+        batch.update(is_active=False)
+        adjust_counter("total_leads", -len(rows))
+        adjust_counter("new_leads", -sum(status == "new" for _, status, _ in rows))
+    invalidate_reports(*{localdate(created_at) for _, _, created_at in rows})
+    return len(rows)
+
+
+def purge_inactive_leads(batch_size=LEAD_PURGE_BATCH_SIZE):
+    """
+    Hard-delete up to ``batch_size`` soft-deleted leads, oldest id first, in
+    one transaction. Returns the number of rows deleted.
+    """
+    with transaction.atomic():
+        ids = list(
+            Lead.all_objects.filter(is_active=False)
+            .order_by("id")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        batch = Lead.all_objects.filter(pk__in=ids)
+        # Soft deletion already unindexed them; this only catches strays
+        unindex_queryset(batch)
+        delete_rows(batch)
+    return len(ids)
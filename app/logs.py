@@ -0,0 +1,47 @@
+import json
+import os
+from logging.handlers import RotatingFileHandler
+
+
+class JsonlFileHandler(RotatingFileHandler):
+    """
+    Append-only, size-rotated log file holding one JSON document per line.
+    The file and its directory are created on the first record.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding="utf-8"):
+        super().__init__(
+            filename,
+            maxBytes=maxBytes,
+            backupCount=backupCount,
+            encoding=encoding,
+            delay=True,
+        )
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def log_files(path):
+    """``path`` and its rotated backups (path.1, path.2, ...), oldest first."""
+    backups = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        backups.append(f"{path}.{index}")
+        index += 1
+    paths = backups[::-1]
+    if os.path.exists(path):
+        paths.append(path)
+    return paths
+
+
+def read_jsonl(path):
+    """Yield every entry of a JSONL log and its backups, skipping broken lines."""
+    for file_path in log_files(path):
+        with open(file_path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
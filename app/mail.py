@@ -0,0 +1,121 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.timezone import now
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Retry delays grow as MAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+MAIL_RETRY_BASE_SECONDS = 60
+MAIL_MAX_ATTEMPTS = 5
+# How long a worker's claim on a batch lasts; a crashed worker's batch is
+# picked up again once it lapses
+MAIL_CLAIM_SECONDS = 300
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """
+    Queue an email for run_mail_worker. Takes the same arguments as send_mail.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=",".join(recipient_list),
+    )
+
+
+def send_pending_mail(
+    batch_size=100,
+    max_attempts=MAIL_MAX_ATTEMPTS,
+    retry_base=MAIL_RETRY_BASE_SECONDS,
+    connection=None,
+):
+    """
+    Send one batch of due outbox emails over a single backend connection.
+
+    The batch is claimed first by pushing its next_attempt_at MAIL_CLAIM_SECONDS
+    ahead with a conditional UPDATE, so concurrent workers never send the same
+    email; only the rows this call claimed are sent. Failed sends are retried
+    with exponential backoff until ``max_attempts``, after which they are marked
+    failed. Returns ``(sent, failed)`` counts for this batch.
+    """
+    due = OutboxEmail.objects.filter(status="pending", next_attempt_at__lte=now())
+    ids = list(due.values_list("pk", flat=True)[:batch_size])
+    if not ids:
+        return 0, 0
+    claimed_until = now() + timedelta(seconds=MAIL_CLAIM_SECONDS)
+    due.filter(pk__in=ids).update(next_attempt_at=claimed_until)
+    claimed = list(
+        OutboxEmail.objects.filter(
+            pk__in=ids, status="pending", next_attempt_at=claimed_until
+        )
+    )
+    if not claimed:
+        return 0, 0
+
+    connection = connection or get_connection()
+    sent = failed = 0
+    if not _open_connection(connection, claimed, max_attempts, retry_base):
+        return 0, len(claimed)
+    try:
+        for position, email in enumerate(claimed, 1):
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                logger.warning("Sending outbox email %s failed: %s", email.pk, e)
+                _record_failure(email, e, max_attempts, retry_base)
+                failed += 1
+                # The failure may have left the SMTP session unusable
+                connection.close()
+                rest = claimed[position:]
+                if rest and not _open_connection(
+                    connection, rest, max_attempts, retry_base
+                ):
+                    return sent, failed + len(rest)
+            else:
+                email.status = "sent"
+                email.attempts += 1
+                email.sent_at = now()
+                email.last_error = ""
+                email.save(
+                    update_fields=["status", "attempts", "sent_at", "last_error"]
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def _open_connection(connection, emails, max_attempts, retry_base):
+    """Open ``connection``, recording a failed attempt for ``emails`` if it fails."""
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning("Could not open mail connection: %s", e)
+        for email in emails:
+            _record_failure(email, e, max_attempts, retry_base)
+        return False
+    return True
+
+
+def _record_failure(email, error, max_attempts, retry_base):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = "failed"
+    else:
+        delay = retry_base * 2 ** (email.attempts - 1)
+        email.next_attempt_at = now() + timedelta(seconds=delay)
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.archive import (
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVES,
+    archivable,
+    archive_batch,
+    archive_cutoff,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move leads, quotes and messages older than ARCHIVE_AFTER_DAYS into "
+        "the archive tables, one batch per transaction. Archived rows leave "
+        "the hot lists, counts and search index; their totals stay on the "
+        "dashboard."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive rows created more than this many days ago "
+            "(default ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=ARCHIVES,
+            help="Archive only this kind of row; may be repeated.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help=f"Rows moved per transaction (default {ARCHIVE_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days must not be negative.")
+        cutoff = archive_cutoff(options["days"])
+        self.stdout.write(f"Archiving rows created before {cutoff:%Y-%m-%d %H:%M}.")
+        for name in options["only"] or ARCHIVES:
+            if options["dry_run"]:
+                count = archivable(name, cutoff).count()
+                self.stdout.write(f"{name}: {count} rows would be archived.")
+                continue
+            total = 0
+            while True:
+                moved = archive_batch(name, cutoff, options["batch_size"])
+                total += moved
+                if moved and options["verbosity"] >= 2:
+                    self.stdout.write(f"{name}: {total} rows archived so far")
+                if moved < options["batch_size"]:
+                    break
+            self.stdout.write(self.style.SUCCESS(f"{name}: {total} rows archived."))
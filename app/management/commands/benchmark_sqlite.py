@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.sqlite import apply_pragmas, sqlite_pragmas
+
+SEED_ROWS = 10000
+
+
+def run_workload(path, pragmas, writers, readers, seconds):
+    """
+    Run ``writers`` threads inserting one row per transaction (like a form
+    post) next to ``readers`` threads running aggregate reads (like the
+    dashboard) against the database at ``path`` for ``seconds``.
+
+    Returns the number of completed writes and reads and of lock errors.
+    """
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def connect():
+        # Python's sqlite3 waits up to timeout seconds on a lock by default;
+        # keep that for the baseline and let busy_timeout override it
+        connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def work(statement, params, kind):
+        connection = connect()
+        done = errors = 0
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    with connection:
+                        connection.execute(statement, params).fetchall()
+                    done += 1
+                except sqlite3.OperationalError:
+                    errors += 1
+        finally:
+            connection.close()
+        with lock:
+            counts[kind] += done
+            counts["errors"] += errors
+
+    insert = "INSERT INTO bench_lead (name, status) VALUES (?, ?)"
+    select = "SELECT status, COUNT(*) FROM bench_lead GROUP BY status"
+    threads = [
+        threading.Thread(target=work, args=(insert, ("Lead", "new"), "writes"))
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=work, args=(select, (), "reads"))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def create_database(path):
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE bench_lead (id INTEGER PRIMARY KEY, name TEXT, status TEXT)"
+        )
+        statuses = ("new", "contacted", "converted")
+        connection.executemany(
+            "INSERT INTO bench_lead (name, status) VALUES (?, ?)",
+            (("Lead", statuses[i % 3]) for i in range(SEED_ROWS)),
+        )
+    connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent read/write throughput on a scratch SQLite database "
+        "with SQLite's default settings and with the configured pragmas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument(
+            "--seconds", type=float, default=5, help="Duration of each run."
+        )
+
+    def handle(self, *args, **options):
+        if options["writers"] < 0 or options["readers"] < 0:
+            raise CommandError("--writers and --readers must not be negative.")
+        runs = (("default", {}), ("tuned", sqlite_pragmas()))
+        self.stdout.write(
+            f"{options['writers']} writers, {options['readers']} readers, "
+            f"{options['seconds']:g}s per run"
+        )
+        self.stdout.write(f"{'run':<10}{'writes/s':>12}{'reads/s':>12}{'errors':>10}")
+        for name, pragmas in runs:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.sqlite3")
+                create_database(path)
+                counts = run_workload(
+                    path,
+                    pragmas,
+                    options["writers"],
+                    options["readers"],
+                    options["seconds"],
+                )
+            self.stdout.write(
+                f"{name:<10}"
+                f"{counts['writes'] / options['seconds']:>12.0f}"
+                f"{counts['reads'] / options['seconds']:>12.0f}"
+                f"{counts['errors']:>10}"
+            )
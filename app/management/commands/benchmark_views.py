@@ -0,0 +1,87 @@
+import logging
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+
+from LPageToAdmin.views import HOME, USERADMIN
+
+VIEWS = {"landing": ("/", HOME), "dashboard": ("/useradmin/", USERADMIN)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the landing page and admin dashboard views with connections "
+        "closed after every request (CONN_MAX_AGE=0) and with persistent "
+        "connections. The page cache is bypassed so every request renders; "
+        "the views still write cache entries and may seed missing counters, "
+        "so point it at a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per view and run."
+        )
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=600,
+            help="CONN_MAX_AGE for the persistent run (default 600).",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+        factory = RequestFactory()
+        # An unsaved staff user, so no user row or session is written
+        user = User(username="benchmark", is_staff=True, is_superuser=True)
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        original_max_age = connection.settings_dict["CONN_MAX_AGE"]
+        # Template variable-lookup debug logging would dominate the timings
+        template_logger = logging.getLogger("django.template")
+        original_level = template_logger.level
+        template_logger.setLevel(logging.WARNING)
+        self.stdout.write(
+            f"{'view':<12}{'CONN_MAX_AGE':>14}{'req/s':>10}{'ms/req':>10}"
+            f"{'connections':>13}"
+        )
+        # Otherwise "/" would be served from the page cache after one render
+        bypass_page_cache = override_settings(PAGE_CACHE_TIMEOUT=0)
+        bypass_page_cache.enable()
+        try:
+            for name, (path, view) in VIEWS.items():
+                for max_age in (0, options["max_age"]):
+                    connection.close()
+                    connection.settings_dict["CONN_MAX_AGE"] = max_age
+                    opened.clear()
+                    started = time.perf_counter()
+                    for _ in range(options["requests"]):
+                        # The same signals that open and recycle connections
+                        # around a real request
+                        request_started.send(sender=self.__class__)
+                        request = factory.get(path)
+                        request.user = user
+                        view(request)
+                        request_finished.send(sender=self.__class__)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{name:<12}{max_age:>14}"
+                        f"{options['requests'] / elapsed:>10.0f}"
+                        f"{elapsed * 1000 / options['requests']:>10.2f}"
+                        f"{len(opened):>13}"
+                    )
+        finally:
+            bypass_page_cache.disable()
+            connection_created.disconnect(count_connection)
+            template_logger.setLevel(original_level)
+            connection.settings_dict["CONN_MAX_AGE"] = original_max_age
+            connection.close()
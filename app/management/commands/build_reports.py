@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
+
+from app.routers import replica_reads
+from app.snapshots import (
+    SNAPSHOT_KEEP,
+    SNAPSHOT_PERIODS,
+    prune_snapshots,
+    snapshot_range,
+    write_snapshot,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute daily, weekly and monthly report snapshots (aggregates and "
+        "CSV export) into REPORTS_SNAPSHOT_DIR. Run it from cron outside "
+        "business hours; it only reads from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--period",
+            action="append",
+            choices=SNAPSHOT_PERIODS,
+            help="Period to build; repeat for several (default: all).",
+        )
+        parser.add_argument(
+            "--date",
+            help="Build the periods completed before this YYYY-MM-DD date "
+            "(default: today).",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=SNAPSHOT_KEEP,
+            help=f"Snapshots kept per period (default {SNAPSHOT_KEEP}).",
+        )
+
+    def handle(self, *args, **options):
+        today = localdate()
+        if options["date"]:
+            today = parse_date(options["date"])
+            if today is None:
+                raise CommandError("--date must be in YYYY-MM-DD format.")
+        if options["keep"] < 1:
+            raise CommandError("--keep must be at least 1.")
+
+        for period in options["period"] or SNAPSHOT_PERIODS:
+            start, end = snapshot_range(period, today)
+            # Read from the replica, when fresh, to stay off the primary
+            with replica_reads():
+                report = write_snapshot(period, start, end)
+            removed = prune_snapshots(period, options["keep"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Built {period} report {start}..{end}: "
+                    f"{report['total_orders']} orders, "
+                    f"{report['total_customers']} leads"
+                    + (
+                        f" ({removed} old or stale snapshots removed)."
+                        if removed
+                        else "."
+                    )
+                )
+            )
@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+import time
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.timezone import localdate
+
+from app.counters import adjust_counter
+from app.leads import archived_emails, normalize_lead_email
+from app.models import Lead
+from app.reports import invalidate_reports
+from app.search import index_queryset
+
+IMPORT_FIELDS = ("name", "email", "phone", "service", "status")
+
+
+def read_rows(path, file_format):
+    """Yield one dict per row of a CSV or JSONL file without loading it whole."""
+    with open(path, newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            for row in csv.DictReader(handle):
+                yield row
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def build_lead(row):
+    """Validate a raw row with the Lead field validators and return a Lead."""
+    if not isinstance(row, dict):
+        raise ValidationError({NON_FIELD_ERRORS: "Row must be a JSON object."})
+    values = {}
+    errors = {}
+    for name in IMPORT_FIELDS:
+        field = Lead._meta.get_field(name)
+        raw = row.get(name)
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw in (None, ""):
+            if field.has_default():
+                continue
+            raw = None if field.null else ""
+        if name == "email":
+            raw = normalize_lead_email(raw)
+        try:
+            values[name] = field.clean(raw, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return Lead(**values)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream leads from a CSV or JSONL file into the database in batches. "
+        "Rows are validated like the Lead model, duplicate emails are skipped, "
+        "and an interrupted import can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with a header row) or JSONL file.")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "jsonl"),
+            help="File format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows written per bulk_create and transaction (default 1000).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the rows committed by a previous, interrupted run.",
+        )
+        parser.add_argument(
+            "--report-duplicates",
+            action="store_true",
+            help="Print every skipped duplicate email.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        file_format = options["format"] or (
+            "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+        )
+        checkpoint_path = f"{path}.checkpoint"
+        self.verbosity = options["verbosity"]
+        self.report_duplicates = options["report_duplicates"]
+
+        skip = 0
+        if options["resume"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as handle:
+                skip = json.load(handle)["rows"]
+            self.stdout.write(f"Resuming after row {skip}.")
+
+        self.stats = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0}
+        started = time.monotonic()
+        row_number = 0
+        batch = []
+        try:
+            for row_number, row in enumerate(read_rows(path, file_format), start=1):
+                if row_number <= skip:
+                    continue
+                self.stats["read"] += 1
+                try:
+                    batch.append(build_lead(row))
+                except ValidationError as e:
+                    self.stats["invalid"] += 1
+                    self.stderr.write(f"Row {row_number}: {e.message_dict}")
+                if len(batch) >= options["batch_size"]:
+                    self.write_batch(batch)
+                    batch = []
+                    self.save_checkpoint(checkpoint_path, row_number)
+                    self.report_progress(started)
+            self.write_batch(batch)
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Row {row_number + 1}: invalid JSON ({e}).")
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        elapsed = time.monotonic() - started
+        rate = self.stats["read"] / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {self.stats['read']} rows in {elapsed:.1f}s "
+                f"({rate:.0f} rows/s): {self.stats['imported']} imported, "
+                f"{self.stats['duplicates']} duplicates, "
+                f"{self.stats['invalid']} invalid."
+            )
+        )
+
+    def write_batch(self, batch):
+        """Insert one batch in a single transaction, skipping known emails."""
+        if not batch:
+            return
+        with transaction.atomic():
+            keys = {lead.email.lower() for lead in batch}
+            existing = set(
+                Lead.objects.annotate(email_key=Lower("email"))
+                .filter(email_key__in=keys)
+                .order_by()
+                .values_list("email_key", flat=True)
+            )
+            existing |= archived_emails(keys)
+            new_leads = []
+            for lead in batch:
+                key = lead.email.lower()
+                if key in existing:
+                    self.stats["duplicates"] += 1
+                    if self.report_duplicates:
+                        self.stdout.write(f"Duplicate: {lead.email}")
+                    continue
+                existing.add(key)
+                new_leads.append(lead)
+            last_pk = (
+                Lead.all_objects.order_by("-pk").values_list("pk", flat=True).first()
+            )
+            # ignore_conflicts covers leads inserted concurrently by the site
+            Lead.objects.bulk_create(new_leads, ignore_conflicts=True)
+            # Read back the rows that were actually inserted, past the last
+            # existing id: ignored conflicts must not be counted, and
+            # bulk_create skips the signals that maintain the counters and the
+            # search index
+            inserted = list(
+                Lead.objects.annotate(email_key=Lower("email"))
+                .filter(
+                    email_key__in=[lead.email.lower() for lead in new_leads],
+                    pk__gt=last_pk or 0,
+                )
+                .order_by()
+                .values_list("pk", "status")
+            )
+            adjust_counter("total_leads", len(inserted))
+            adjust_counter("new_leads", sum(status == "new" for _, status in inserted))
+            if inserted:
+                index_queryset(
+                    Lead.objects.filter(pk__in=[pk for pk, _ in inserted])
+                )
+        if inserted:
+            invalidate_reports(localdate())
+        self.stats["imported"] += len(inserted)
+        self.stats["duplicates"] += len(new_leads) - len(inserted)
+
+    def save_checkpoint(self, checkpoint_path, rows):
+        with open(checkpoint_path, "w") as handle:
+            json.dump({"rows": rows}, handle)
+
+    def report_progress(self, started):
+        if self.verbosity < 2:
+            return
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{self.stats['read']} rows, {self.stats['imported']} imported "
+            f"({self.stats['read'] / elapsed:.0f} rows/s)"
+        )
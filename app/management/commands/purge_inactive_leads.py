@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localtime
+
+from app.leads import LEAD_PURGE_BATCH_SIZE, purge_inactive_leads
+
+
+def parse_quiet_hours(value):
+    """Parse "start-end" local hours into a pair of ints between 0 and 24."""
+    try:
+        start, end = (int(part) for part in value.split("-"))
+    except ValueError:
+        raise CommandError(f"Quiet hours must look like 1-5, not {value!r}.")
+    if not (0 <= start <= 23 and 0 <= end <= 24):
+        raise CommandError(f"Quiet hours out of range: {value!r}.")
+    return start, end
+
+
+def in_quiet_hours(hour, start, end):
+    if start <= end:
+        return start <= hour < end
+    # The window wraps midnight, e.g. 22-4
+    return hour >= start or hour < end
+
+
+class Command(BaseCommand):
+    help = (
+        "Hard-delete soft-deleted leads in small batches, pausing between "
+        "batches. Runs only during LEAD_PURGE_QUIET_HOURS unless --force is "
+        "given, so it can be scheduled often."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=LEAD_PURGE_BATCH_SIZE,
+            help=f"Rows deleted per transaction (default {LEAD_PURGE_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds to pause between batches so other writers get the "
+            "database lock (default 0.5).",
+        )
+        parser.add_argument(
+            "--quiet-hours",
+            default=settings.LEAD_PURGE_QUIET_HOURS,
+            help="Local hours to run in, as start-end (default "
+            "LEAD_PURGE_QUIET_HOURS).",
+        )
+        parser.add_argument(
+            "--force", action="store_true", help="Run outside the quiet hours."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        start, end = parse_quiet_hours(options["quiet_hours"])
+
+        def may_run():
+            return options["force"] or in_quiet_hours(localtime().hour, start, end)
+
+        if not may_run():
+            self.stdout.write(
+                f"Outside quiet hours ({start:02d}:00-{end:02d}:00); nothing purged."
+            )
+            return
+        total = 0
+        while True:
+            deleted = purge_inactive_leads(options["batch_size"])
+            total += deleted
+            if deleted < options["batch_size"]:
+                break
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"{total} leads purged so far")
+            time.sleep(options["sleep"])
+            # A long purge stops when the window closes and resumes next run
+            if not may_run():
+                self.stdout.write(
+                    f"Quiet hours ended after {total} leads; stopping until the "
+                    "next run."
+                )
+                break
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} inactive leads."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app.pagecache import purge_page_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop the cached public pages and the header and footer fragments. "
+        "Run after deploying template or static page changes."
+    )
+
+    def handle(self, *args, **options):
+        purge_page_cache()
+        self.stdout.write(self.style.SUCCESS("Page cache purged."))
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.logs import read_jsonl
+from app.querystats import summarize_samples
+
+SORTS = {
+    "queries": "queries_max",
+    "time": "db_ms_mean",
+    "requests": "requests",
+    "over": "over_budget",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize the per-request query samples recorded by "
+        "QueryStatsMiddleware: queries, database time and budget overruns "
+        "per URL name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help="Samples file; defaults to QUERY_STATS_FILE and its backups.",
+        )
+        parser.add_argument(
+            "--view", action="append", help="Only report this URL name."
+        )
+        parser.add_argument(
+            "--sort",
+            choices=SORTS,
+            default="queries",
+            help="Sort views by max queries, mean DB time, requests or overruns.",
+        )
+        parser.add_argument(
+            "--show-sql",
+            action="store_true",
+            help="Print the slowest statement seen for each view.",
+        )
+
+    def handle(self, *args, **options):
+        samples = read_jsonl(options["file"] or settings.QUERY_STATS_FILE)
+        if options["view"]:
+            samples = (row for row in samples if row.get("view") in options["view"])
+        summary = summarize_samples(samples)
+        if not summary:
+            raise CommandError("No query samples recorded.")
+        summary.sort(key=lambda row: row[SORTS[options["sort"]]], reverse=True)
+
+        self.stdout.write(
+            f"{'view':<32}{'requests':>9}{'mean':>7}{'p95':>6}{'max':>6}"
+            f"{'budget':>8}{'over':>6}{'db ms':>9}{'max ms':>9}{'slowest':>9}"
+        )
+        for row in summary:
+            budget = "-" if row["budget"] is None else row["budget"]
+            line = (
+                f"{row['view']:<32}{row['requests']:>9}"
+                f"{row['queries_mean']:>7.1f}{row['queries_p95']:>6}"
+                f"{row['queries_max']:>6}{budget:>8}{row['over_budget']:>6}"
+                f"{row['db_ms_mean']:>9.2f}{row['db_ms_max']:>9.2f}"
+                f"{row['slowest_ms']:>9.2f}"
+            )
+            if row["over_budget"]:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+            if options["show_sql"] and row["slowest_sql"]:
+                self.stdout.write(f"    {row['slowest_sql']}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app.rollups import rebuild_revenue_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly and daily revenue rollup tables from the Order table."
+
+    def handle(self, *args, **options):
+        monthly, daily = rebuild_revenue_rollups()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {monthly} monthly and {daily} daily revenue rollup rows."
+            )
+        )
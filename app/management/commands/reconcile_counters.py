@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized badge counters from the source tables. "
+        "Run periodically (e.g. from cron) to correct drift from bulk updates."
+    )
+
+    def handle(self, *args, **options):
+        for name, value in reconcile_counters().items():
+            self.stdout.write(f"{name} = {value}")
+        self.stdout.write(self.style.SUCCESS("Counters reconciled."))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.routers import refresh_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary database into the read-only analytics replica with "
+        "SQLite's online backup API. With --interval, keep refreshing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Seconds between refreshes; refresh once when omitted. Keep it "
+            "below REPLICA_MAX_LAG.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                elapsed = refresh_replica()
+                self.stdout.write(f"Replica refreshed in {elapsed:.2f}s.")
+                if not options["interval"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from app.search import SEARCH_FIELDS, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for leads, quotes and messages."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows inserted per statement batch (default 1000).",
+        )
+
+    def handle(self, *args, **options):
+        for model in SEARCH_FIELDS:
+            count = rebuild_search_index(model, batch_size=options["batch_size"])
+            plural = str(model._meta.verbose_name_plural).lower()
+            self.stdout.write(f"Indexed {count} {plural}.")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.mail import MAIL_MAX_ATTEMPTS, MAIL_RETRY_BASE_SECONDS, send_pending_mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the email outbox in batches over one reused connection to the "
+        "configured EMAIL_BACKEND. For local testing, point EMAIL_HOST and "
+        "EMAIL_PORT at a stand-in SMTP server such as "
+        "'python -m aiosmtpd -n -l localhost:1025'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send everything that is due, then exit.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Emails sent per connection (default 100).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the outbox is empty (default 5).",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=MAIL_MAX_ATTEMPTS,
+            help=f"Attempts before an email is marked failed "
+            f"(default {MAIL_MAX_ATTEMPTS}).",
+        )
+        parser.add_argument(
+            "--retry-base",
+            type=float,
+            default=MAIL_RETRY_BASE_SECONDS,
+            help="Seconds before the first retry; doubles on each later retry "
+            f"(default {MAIL_RETRY_BASE_SECONDS}).",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = send_pending_mail(
+                    batch_size=options["batch_size"],
+                    max_attempts=options["max_attempts"],
+                    retry_base=options["retry_base"],
+                )
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed}.")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Mail worker stopped: {total_sent} sent, {total_failed} failed."
+            )
+        )
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.logs import read_jsonl
+from app.slowqueries import summarize_slow_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Group the slow query log by normalized SQL fingerprint, slowest total "
+        "time first, and flag the statements that scan whole tables or "
+        "indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", help="Slow query log; defaults to SLOW_QUERY_LOG and its backups."
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Groups to show (default 20)."
+        )
+        parser.add_argument(
+            "--scans-only",
+            action="store_true",
+            help="Only show statements whose plan scans a whole table or index.",
+        )
+        parser.add_argument(
+            "--plan", action="store_true", help="Print each group's query plan."
+        )
+
+    def handle(self, *args, **options):
+        groups = summarize_slow_queries(
+            read_jsonl(options["file"] or settings.SLOW_QUERY_LOG)
+        )
+        if options["scans_only"]:
+            groups = [
+                group for group in groups if group["scans"] or group["index_scans"]
+            ]
+        if not groups:
+            raise CommandError("No slow queries recorded.")
+
+        for group in groups[: options["limit"]]:
+            header = (
+                f"{group['fingerprint']}  {group['count']}x  "
+                f"total {group['total_ms']:.1f}ms  "
+                f"mean {group['total_ms'] / group['count']:.1f}ms  "
+                f"max {group['max_ms']:.1f}ms"
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(header))
+            for key, label in (
+                ("scans", "Full table scan"),
+                ("index_scans", "Full index scan"),
+            ):
+                if group[key]:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"  {label}: {', '.join(sorted(group[key]))}"
+                        )
+                    )
+            if group["views"]:
+                self.stdout.write(f"  Views: {', '.join(sorted(group['views']))}")
+            self.stdout.write(f"  {group['sql']}")
+            if options["plan"] and group["plan"]:
+                for line in group["plan"]:
+                    self.stdout.write(f"    {line}")
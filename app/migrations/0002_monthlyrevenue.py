@@ -0,0 +1,71 @@
+from django.db import migrations, models
+
+
+def backfill_monthly_revenue(apps, schema_editor):
+    Order = apps.get_model("app", "Order")
+    MonthlyRevenue = apps.get_model("app", "MonthlyRevenue")
+    buckets = {}
+    for order_date, status, amount in Order.objects.values_list(
+        "date", "status", "amount"
+    ).iterator():
+        key = (order_date.year, order_date.month, status)
+        total, count = buckets.get(key, (0, 0))
+        buckets[key] = (total + amount, count + 1)
+    MonthlyRevenue.objects.bulk_create(
+        MonthlyRevenue(
+            year=year, month=month, status=status, total=total, order_count=count
+        )
+        for (year, month, status), (total, count) in buckets.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("in-progress", "In Progress"),
+                            ("completed", "Completed"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("order_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["year", "month", "status"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyrevenue",
+            constraint=models.UniqueConstraint(
+                fields=("year", "month", "status"), name="unique_monthly_revenue"
+            ),
+        ),
+        migrations.RunPython(backfill_monthly_revenue, migrations.RunPython.noop),
+    ]
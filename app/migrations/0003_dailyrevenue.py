@@ -0,0 +1,67 @@
+from django.db import migrations, models
+
+
+def backfill_daily_revenue(apps, schema_editor):
+    Order = apps.get_model("app", "Order")
+    DailyRevenue = apps.get_model("app", "DailyRevenue")
+    buckets = {}
+    for order_date, status, amount in Order.objects.values_list(
+        "date", "status", "amount"
+    ).iterator():
+        total, count = buckets.get((order_date, status), (0, 0))
+        buckets[(order_date, status)] = (total + amount, count + 1)
+    DailyRevenue.objects.bulk_create(
+        DailyRevenue(date=order_date, status=status, total=total, order_count=count)
+        for (order_date, status), (total, count) in buckets.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0002_monthlyrevenue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("in-progress", "In Progress"),
+                            ("completed", "Completed"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("order_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["date", "status"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyrevenue",
+            constraint=models.UniqueConstraint(
+                fields=("date", "status"), name="unique_daily_revenue"
+            ),
+        ),
+        migrations.RunPython(backfill_daily_revenue, migrations.RunPython.noop),
+    ]
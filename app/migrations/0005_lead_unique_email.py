@@ -0,0 +1,80 @@
+import django.db.models.functions.text
+from django.contrib.auth.base_user import BaseUserManager
+from django.db import migrations, models
+
+
+def _email_key(email):
+    return BaseUserManager.normalize_email((email or "").strip()).lower()
+
+
+def deactivate_duplicate_lead_emails(apps, schema_editor):
+    """
+    Normalize emails and deactivate every active lead whose address an older
+    active lead already uses, so the unique index can be built. Nothing is
+    deleted: the duplicates stay in the table, inactive, for review.
+    """
+    Lead = apps.get_model("app", "Lead")
+    seen = set()
+    duplicates = []
+    leads = Lead.objects.filter(is_active=True).order_by("id")
+    for pk, email in leads.values_list("id", "email"):
+        normalized = BaseUserManager.normalize_email((email or "").strip())
+        if normalized.lower() in seen:
+            duplicates.append((pk, email))
+            continue
+        seen.add(normalized.lower())
+        if normalized != email:
+            Lead.objects.filter(pk=pk).update(email=normalized)
+    if duplicates:
+        Lead.objects.filter(pk__in=[pk for pk, _ in duplicates]).update(
+            is_active=False
+        )
+        print(f"\n  Deactivated {len(duplicates)} lead(s) with a duplicate email:")
+        for pk, email in duplicates:
+            print(f"    lead {pk}: {email}")
+
+
+def reactivate_duplicate_lead_emails(apps, schema_editor):
+    """
+    Undo deactivate_duplicate_lead_emails: reactivate the inactive leads that
+    share their address with an active one. Normalized emails are kept.
+    """
+    Lead = apps.get_model("app", "Lead")
+    active = {
+        _email_key(email)
+        for email in Lead.objects.filter(is_active=True).values_list(
+            "email", flat=True
+        )
+    }
+    Lead.objects.filter(
+        pk__in=[
+            pk
+            for pk, email in Lead.objects.filter(is_active=False).values_list(
+                "id", "email"
+            )
+            if _email_key(email) in active
+        ]
+    ).update(is_active=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0004_lead_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            deactivate_duplicate_lead_emails, reactivate_duplicate_lead_emails
+        ),
+        migrations.AddConstraint(
+            model_name="lead",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                # Deactivated duplicates keep their address
+                condition=models.Q(("is_active", True)),
+                name="unique_lead_email_ci",
+                violation_error_message="This email has already been submitted.",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+def sync_quote_columns(apps, schema_editor):
+    """
+    Bring app_quote in line with the Quote model.
+
+    Databases created from 0001_initial still have ``message`` and ``status``
+    columns, while older local databases were already edited by hand, so each
+    change is only applied when it is still needed.
+    """
+    table = schema_editor.quote_name("app_quote")
+    with schema_editor.connection.cursor() as cursor:
+        columns = {
+            column.name
+            for column in schema_editor.connection.introspection.get_table_description(
+                cursor, "app_quote"
+            )
+        }
+    if "message" in columns and "details" not in columns:
+        schema_editor.execute(f"ALTER TABLE {table} RENAME COLUMN message TO details")
+    if "status" in columns:
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN status")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0005_lead_unique_email"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(sync_quote_columns, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.RenameField(
+                    model_name="quote", old_name="message", new_name="details"
+                ),
+                migrations.RemoveField(model_name="quote", name="status"),
+            ],
+        ),
+    ]
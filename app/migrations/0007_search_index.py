@@ -0,0 +1,42 @@
+from django.db import migrations
+
+SEARCH_TABLES = {
+    "app_lead": ("name", "email", "phone", "service"),
+    "app_quote": ("name", "email", "details"),
+    "app_message": ("subject", "content"),
+}
+
+
+def create_search_tables(apps, schema_editor):
+    """Create and fill the FTS5 search tables. SQLite only."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, fields in SEARCH_TABLES.items():
+        columns = ", ".join(fields)
+        values = ", ".join(f"COALESCE({field}, '')" for field in fields)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts "
+            f"USING fts5({columns}, tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {table}_fts (rowid, {columns}) "
+            f"SELECT id, {values} FROM {table}"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table in SEARCH_TABLES:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0006_quote_details"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    Counter = apps.get_model("app", "Counter")
+    Lead = apps.get_model("app", "Lead")
+    Message = apps.get_model("app", "Message")
+    Counter.objects.bulk_create(
+        [
+            Counter(name="total_leads", value=Lead.objects.count()),
+            Counter(name="new_leads", value=Lead.objects.filter(status="new").count()),
+            Counter(name="total_messages", value=Message.objects.count()),
+            Counter(
+                name="unread_messages",
+                value=Message.objects.filter(is_read=False).count(),
+            ),
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0008_outboxemail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Counter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("value", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0011_project_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="lead",
+            options={
+                "ordering": ["-created_at"],
+                "verbose_name": "Lead",
+                "verbose_name_plural": "Leads",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                fields=["status", "created_at"], name="lead_status_created_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["is_read", "created_at"], name="message_is_read_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["created_at", "id"], name="message_created_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="quote",
+            index=models.Index(
+                fields=["created_at", "id"], name="quote_created_at_id_idx"
+            ),
+        ),
+    ]
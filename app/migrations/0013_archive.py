@@ -0,0 +1,115 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def seed_archive_counters(apps, schema_editor):
+    Counter = apps.get_model("app", "Counter")
+    for name in ("archived_leads", "archived_quotes", "archived_messages"):
+        Counter.objects.get_or_create(name=name, defaults={"value": 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0012_hot_column_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedLead",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("name", models.CharField(max_length=100)),
+                ("email", models.EmailField(max_length=254)),
+                ("phone", models.CharField(blank=True, max_length=15, null=True)),
+                (
+                    "service",
+                    models.CharField(
+                        choices=[
+                            ("window_replacement", "Window Replacement"),
+                            ("door_installation", "Door Installation"),
+                            ("roof_repair", "Roof Repair"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "New"),
+                            ("contacted", "Contacted"),
+                            ("converted", "Converted"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedMessage",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("sender", models.CharField(max_length=100)),
+                ("receiver", models.CharField(max_length=100)),
+                ("subject", models.CharField(max_length=200)),
+                ("content", models.TextField()),
+                ("is_read", models.BooleanField(default=False)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedQuote",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("name", models.CharField(max_length=255)),
+                ("email", models.EmailField(max_length=254)),
+                ("phone", models.CharField(blank=True, max_length=15, null=True)),
+                ("details", models.TextField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedlead",
+            index=models.Index(
+                fields=["created_at", "id"], name="archivedlead_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedlead",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="archivedlead_email_ci_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedquote",
+            index=models.Index(
+                fields=["created_at", "id"], name="archivedquote_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedmessage",
+            index=models.Index(
+                fields=["created_at", "id"], name="archivedmsg_created_id_idx"
+            ),
+        ),
+        migrations.RunPython(seed_archive_counters, migrations.RunPython.noop),
+    ]
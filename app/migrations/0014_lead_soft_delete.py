@@ -0,0 +1,93 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def count_leads(apps, leads):
+    Counter = apps.get_model("app", "Counter")
+    for name, value in (
+        ("total_leads", leads.count()),
+        ("new_leads", leads.filter(status="new").count()),
+    ):
+        Counter.objects.update_or_create(name=name, defaults={"value": value})
+
+
+def exclude_inactive_leads(apps, schema_editor):
+    """
+    Count only active leads and drop inactive ones from the search index, as
+    the Lead signals do from now on.
+    """
+    Lead = apps.get_model("app", "Lead")
+    count_leads(apps, Lead.objects.filter(is_active=True))
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            "DELETE FROM app_lead_fts WHERE rowid IN "
+            "(SELECT id FROM app_lead WHERE NOT is_active)"
+        )
+
+
+def include_inactive_leads(apps, schema_editor):
+    Lead = apps.get_model("app", "Lead")
+    count_leads(apps, Lead.objects.all())
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            "INSERT OR REPLACE INTO app_lead_fts (rowid, name, email, phone, service) "
+            "SELECT id, COALESCE(name, ''), COALESCE(email, ''), "
+            "COALESCE(phone, ''), COALESCE(service, '') "
+            "FROM app_lead WHERE NOT is_active"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0013_archive"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="lead",
+            name="unique_lead_email_ci",
+        ),
+        migrations.RemoveIndex(
+            model_name="lead",
+            name="lead_created_at_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="lead",
+            name="lead_status_created_at_idx",
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["created_at", "id"],
+                name="lead_created_at_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["status", "created_at"],
+                name="lead_status_created_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                condition=models.Q(("is_active", False)),
+                fields=["id"],
+                name="lead_inactive_id_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="lead",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("is_active", True)),
+                name="unique_lead_email_ci",
+                violation_error_message="This email has already been submitted.",
+            ),
+        ),
+        migrations.RunPython(exclude_inactive_leads, include_inactive_leads),
+    ]
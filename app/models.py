@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MinLengthValidator, RegexValidator
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.timezone import now
 
 
@@ -51,10 +52,59 @@ class Order(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the orders list, filtered by status or not
+            models.Index(fields=["status", "date", "id"], name="order_status_date_idx"),
+            models.Index(fields=["date", "id"], name="order_date_id_idx"),
+            models.Index(fields=["amount", "id"], name="order_amount_id_idx"),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.status} - ${self.amount}"
 
 
+class MonthlyRevenue(models.Model):
+    """Revenue rollup per (year, month, status), maintained by Order signals."""
+
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["year", "month", "status"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month", "status"], name="unique_monthly_revenue"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.status}: ${self.total}"
+
+
+class DailyRevenue(models.Model):
+    """Revenue rollup per (date, status), used for arbitrary-range time series."""
+
+    date = models.DateField()
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["date", "status"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "status"], name="unique_daily_revenue"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.status}: ${self.total}"
+
+
 # Project Model
 class Project(models.Model):
     window_style = models.CharField(max_length=100)
@@ -63,6 +113,14 @@ class Project(models.Model):
         choices=(("completed", "Completed"), ("in-progress", "In Progress")),
     )
 
+    class Meta:
+        indexes = [
+            # Covers the popular window styles GROUP BY
+            models.Index(fields=["window_style"], name="project_window_style_idx"),
+            # Status filter with newest-first keyset pagination
+            models.Index(fields=["status", "id"], name="project_status_id_idx"),
+        ]
+
     def __str__(self):
         return self.window_style
 
@@ -75,10 +133,23 @@ class Quote(models.Model):
     details = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Date-range reports and exports, ordered by (created_at, id)
+            models.Index(fields=["created_at", "id"], name="quote_created_at_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.email}"
 
 
+class ActiveLeadManager(models.Manager):
+    """Leads that have not been soft-deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
 class Lead(models.Model):
     SERVICES = (
         ("window_replacement", "Window Replacement"),
@@ -110,16 +181,64 @@ class Lead(models.Model):
     )
     status = models.CharField(max_length=50, choices=STATUSES, default="new")
     created_at = models.DateTimeField(auto_now_add=True)
+    # False once soft-deleted; purge_inactive_leads removes the row later
     is_active = models.BooleanField(default=True)
 
-    def __str__(self):
-        return f"{self.name} ({self.email})"
+    objects = ActiveLeadManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Lead"
+        verbose_name_plural = "Leads"
+        # The list, count and status indexes only cover active leads, which
+        # is all the default manager ever reads
+        indexes = [
+            # Supports keyset pagination over (created_at, id), newest first
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_active=True),
+                name="lead_created_at_id_idx",
+            ),
+            # Status filters and counts, newest first within a status
+            models.Index(
+                fields=["status", "created_at"],
+                condition=models.Q(is_active=True),
+                name="lead_status_created_at_idx",
+            ),
+            # Lets the purge find soft-deleted leads without a table scan
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_active=False),
+                name="lead_inactive_id_idx",
+            ),
+        ]
+        constraints = [
+            # A soft-deleted lead's email may be submitted again
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=models.Q(is_active=True),
+                name="unique_lead_email_ci",
+                violation_error_message="This email has already been submitted.",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status and active flag so counter signals can
+        # detect changes
+        instance._loaded_status = instance.__dict__.get("status")
+        instance._loaded_is_active = instance.__dict__.get("is_active")
+        return instance
 
+    def validate_constraints(self, exclude=None):
+        # Forms never include is_active, but the email constraint's condition
+        # needs it to be checked at all
+        super().validate_constraints(exclude=set(exclude or ()) - {"is_active"})
 
-class Meta:
-    ordering = ["-created_at"]
-    verbose_name = "Lead"
-    verbose_name_plural = "Leads"
+    def __str__(self):
+        return f"{self.name} ({self.email})"
 
 
 class Message(models.Model):
@@ -142,21 +261,159 @@ class Message(models.Model):
         ordering = ["-created_at"]  # Order messages by newest first
         verbose_name = "Message"  # Friendly name in Django admin
         verbose_name_plural = "Messages"  # Plural name in Django admin
+        indexes = [
+            # Unread counts and the unread inbox, newest first
+            models.Index(
+                fields=["is_read", "created_at"], name="message_is_read_created_idx"
+            ),
+            # Newest-first inbox and date-range selections
+            models.Index(fields=["created_at", "id"], name="message_created_at_id_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored read status so counter signals can detect changes
+        instance._loaded_is_read = instance.__dict__.get("is_read")
+        return instance
 
     def mark_as_read(self):
         """Mark the message as read."""
-        self.is_read = True
-        self.save()
+        self.update_read_status(True)
 
     def update_read_status(self, read_status=True):
         """Update the read/unread status of the message."""
-        self.is_read = read_status
-        self.save()
+        from .counters import adjust_counter
+
+        changed = Message.objects.filter(pk=self.pk, is_read=not read_status).update(
+            is_read=read_status
+        )
+        self.is_read = self._loaded_is_read = read_status
+        if changed:
+            adjust_counter("unread_messages", -1 if read_status else 1)
 
     def __str__(self):
         return f"{self.subject} ({'Read' if self.is_read else 'Unread'})"
 
 
+class OutboxEmail(models.Model):
+    """An email queued by a request handler and sent by run_mail_worker."""
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField(help_text="Comma-separated recipient addresses")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="outbox_status_due_idx"
+            ),
+        ]
+
+    @property
+    def recipients(self):
+        return [address for address in self.to.split(",") if address]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
+
+
+class Counter(models.Model):
+    """A denormalized count, kept current by signals and app.counters."""
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ArchivedRecord(models.Model):
+    """
+    A row moved out of its hot table by app.archive. The primary key and
+    creation time of the original row are kept.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["-created_at"]
+
+
+class ArchivedLead(ArchivedRecord):
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=15, blank=True, null=True)
+    service = models.CharField(max_length=100, choices=Lead.SERVICES)
+    status = models.CharField(max_length=50, choices=Lead.STATUSES)
+    is_active = models.BooleanField(default=True)
+
+    class Meta(ArchivedRecord.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="archivedlead_created_id_idx"
+            ),
+            # import_leads skips rows whose email belongs to an archived lead
+            models.Index(Lower("email"), name="archivedlead_email_ci_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.email})"
+
+
+class ArchivedQuote(ArchivedRecord):
+    name = models.CharField(max_length=255)
+    email = models.EmailField()
+    phone = models.CharField(max_length=15, blank=True, null=True)
+    details = models.TextField(blank=True, null=True)
+
+    class Meta(ArchivedRecord.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="archivedquote_created_id_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.email}"
+
+
+class ArchivedMessage(ArchivedRecord):
+    sender = models.CharField(max_length=100)
+    receiver = models.CharField(max_length=100)
+    subject = models.CharField(max_length=200)
+    content = models.TextField()
+    is_read = models.BooleanField(default=False)
+
+    class Meta(ArchivedRecord.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="archivedmsg_created_id_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.sender})"
+
+
 class QuoteForm(forms.ModelForm):
     class Meta:
         model = Quote
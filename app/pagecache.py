@@ -0,0 +1,90 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+PAGE_CACHE_VERSION_KEY = "pagecache:version"
+# Stands in for the per-visitor CSRF token in cached pages; every response
+# gets the visitor's own token substituted back in
+CSRF_PLACEHOLDER = "__pagecache_csrf_token__"
+# {% cache %} fragments of the shared includes, dropped with the pages
+TEMPLATE_FRAGMENTS = ("site_header", "site_footer")
+
+
+def page_cache_key(name):
+    version = cache.get(PAGE_CACHE_VERSION_KEY, 0)
+    return f"pagecache:{version}:{name}"
+
+
+def purge_page_cache():
+    """
+    Drop every cached page by moving to a new cache version, and delete the
+    header and footer fragments.
+    """
+    try:
+        cache.incr(PAGE_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(PAGE_CACHE_VERSION_KEY, 1, None)
+    cache.delete_many([make_template_fragment_key(name) for name in TEMPLATE_FRAGMENTS])
+
+
+def is_cacheable_request(request):
+    """
+    Whether ``request`` may be served a shared copy of a public page.
+
+    Messages live in the session and logged-in users have one, so only
+    GET and HEAD requests without a session cookie qualify. Only cookies are
+    inspected; the session itself is never loaded.
+    """
+    return (
+        settings.PAGE_CACHE_TIMEOUT > 0
+        and request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def render_public_page(request, template_name, context=None):
+    """Render a public page with CSRF_PLACEHOLDER in place of the CSRF token."""
+    context = {**(context or {}), "csrf_token": CSRF_PLACEHOLDER}
+    return render(request, template_name, context)
+
+
+def cache_public_page(view):
+    """
+    Serve an anonymous visitor's page from the cache, keyed by view name and
+    ignoring the query string, for PAGE_CACHE_TIMEOUT seconds.
+
+    The view must render with render_public_page. A cache hit neither renders
+    a template nor touches the session; only the visitor's CSRF token is
+    substituted in. Responses vary on Cookie and are private, since they
+    carry that token.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        cacheable = is_cacheable_request(request)
+        key = page_cache_key(view.__name__) if cacheable else None
+        content = cache.get(key) if cacheable else None
+        if content is not None:
+            response = HttpResponse(content)
+        else:
+            response = view(request, *args, **kwargs)
+            if response.streaming:
+                return response
+            if cacheable and response.status_code == 200:
+                cache.set(key, response.content, settings.PAGE_CACHE_TIMEOUT)
+        placeholder = CSRF_PLACEHOLDER.encode()
+        if placeholder in response.content:
+            response.content = response.content.replace(
+                placeholder, get_token(request).encode()
+            )
+        patch_vary_headers(response, ("Cookie",))
+        patch_cache_control(response, private=True)
+        return response
+
+    return wrapper
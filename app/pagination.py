@@ -0,0 +1,109 @@
+import base64
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    raw = f"{value}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, to_python=parse_datetime):
+    """Split a cursor into its sort value, converted by ``to_python``, and pk."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, pk = base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+        value = to_python(value)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError, ValidationError):
+        raise InvalidCursor(cursor)
+    if value is None:
+        raise InvalidCursor(cursor)
+    return value, pk
+
+
+class KeysetPage:
+    """
+    One page of a keyset pagination over (sort field, id).
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_paginate(
+    queryset, page_size, after=None, before=None, ordering="-created_at"
+):
+    """
+    Return the page of ``queryset`` following ``after`` or preceding ``before``.
+
+    Rows are ordered by ``ordering`` (a field name, optionally prefixed with
+    ``-``) and then by id in the same direction. Each cursor becomes a range
+    condition on the (field, id) index, so every page costs one index seek
+    plus ``page_size`` rows, however deep the page is.
+    """
+    descending = ordering.startswith("-")
+    name = ordering.lstrip("-")
+    to_python = queryset.model._meta.get_field(name).to_python
+    forward, backward = ("lt", "gt") if descending else ("gt", "lt")
+    # Ordering by id alone needs no tie-breaker
+    fields = (name,) if name == "id" else (name, "id")
+    order = [f"-{field}" if descending else field for field in fields]
+    reverse_order = [field if descending else f"-{field}" for field in fields]
+
+    def seek(queryset, cursor, op):
+        value, pk = decode_cursor(cursor, to_python)
+        if name == "id":
+            return queryset.filter(**{f"id__{op}": pk})
+        return queryset.filter(**{f"{name}__{op}e": value}).filter(
+            Q(**{f"{name}__{op}": value}) | Q(**{f"id__{op}": pk})
+        )
+
+    if before:
+        rows = list(
+            seek(queryset, before, backward).order_by(*reverse_order)[: page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_previous, has_next = has_more, True
+    else:
+        if after:
+            queryset = seek(queryset, after, forward)
+        rows = list(queryset.order_by(*order)[: page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = bool(after)
+
+    if not rows:
+        return KeysetPage([])
+    first, last = rows[0], rows[-1]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(getattr(last, name), last.pk) if has_next else None,
+        previous_cursor=(
+            encode_cursor(getattr(first, name), first.pk) if has_previous else None
+        ),
+    )
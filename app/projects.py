@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Project
+from .pagination import InvalidCursor, keyset_paginate
+from .routers import replica_cache_timeout
+
+POPULAR_STYLES_CACHE_KEY = "projects:popular_window_styles"
+POPULAR_STYLES_LIMIT = 5
+# Bounds staleness after Project changes that send no signals
+# (QuerySet.update() and raw SQL)
+POPULAR_STYLES_CACHE_TIMEOUT = 15 * 60
+
+
+def popular_window_styles(limit=POPULAR_STYLES_LIMIT):
+    """
+    The ``limit`` most common window styles with their project counts.
+
+    The top POPULAR_STYLES_LIMIT are cached: the GROUP BY runs once per change
+    to Project, or after POPULAR_STYLES_CACHE_TIMEOUT at the latest; the
+    Project signals drop the cached result. Larger limits are always queried.
+    """
+    if limit > POPULAR_STYLES_LIMIT:
+        return _top_window_styles(limit)
+    styles = cache.get(POPULAR_STYLES_CACHE_KEY)
+    if styles is None:
+        styles = _top_window_styles(POPULAR_STYLES_LIMIT)
+        cache.set(
+            POPULAR_STYLES_CACHE_KEY,
+            styles,
+            replica_cache_timeout(POPULAR_STYLES_CACHE_TIMEOUT),
+        )
+    return styles[:limit]
+
+
+def _top_window_styles(limit):
+    return list(
+        Project.objects.values("window_style")
+        .annotate(style_count=Count("id"))
+        .order_by("-style_count", "window_style")[:limit]
+    )
+
+
+def invalidate_popular_window_styles():
+    cache.delete(POPULAR_STYLES_CACHE_KEY)
+
+
+def projects_page(page_size, status=None, after=None, before=None):
+    """Newest-first keyset page of projects, optionally filtered by status."""
+    projects = Project.objects.all()
+    if status:
+        projects = projects.filter(status=status)
+    try:
+        return keyset_paginate(projects, page_size, after, before, ordering="-id")
+    except InvalidCursor:
+        return keyset_paginate(projects, page_size, ordering="-id")
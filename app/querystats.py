@@ -0,0 +1,169 @@
+import json
+import logging
+import math
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.utils.timezone import now
+
+logger = logging.getLogger(__name__)
+# One JSON object per instrumented request, written by the LOGGING handler
+sample_logger = logging.getLogger("app.querystats.samples")
+
+# Longest SQL kept for the slowest statement of a sample
+SLOWEST_SQL_MAX_LENGTH = 1000
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryStats:
+    """
+    Query count, total database time and slowest statement, collected as an
+    execute wrapper on every database connection.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.slowest_sql is None or elapsed > self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql[:SLOWEST_SQL_MAX_LENGTH]
+
+
+@contextmanager
+def wrap_all_connections(wrapper):
+    """Install ``wrapper`` as an execute wrapper on every database connection."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield wrapper
+
+
+@contextmanager
+def capture_queries():
+    """Collect QueryStats for every query run on any database in the block."""
+    with wrap_all_connections(QueryStats()) as stats:
+        yield stats
+
+
+def query_budget(view_name):
+    """
+    The query budget for a URL name, falling back to QUERY_BUDGET_DEFAULT for
+    views without an entry in QUERY_BUDGETS.
+    """
+    return settings.QUERY_BUDGETS.get(view_name, settings.QUERY_BUDGET_DEFAULT)
+
+
+def check_budget(view_name, stats):
+    """
+    Warn, or raise QueryBudgetExceeded when QUERY_BUDGET_ACTION is "raise",
+    if ``stats`` ran more queries than the view's budget.
+    """
+    budget = query_budget(view_name)
+    if budget is None or stats.count <= budget:
+        return
+    message = (
+        f"{view_name} ran {stats.count} queries (budget {budget}) in "
+        f"{stats.duration * 1000:.1f}ms"
+    )
+    if settings.QUERY_BUDGET_ACTION == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def record_sample(view_name, stats, status=None):
+    budget = query_budget(view_name)
+    sample_logger.info(
+        json.dumps(
+            {
+                "time": now().isoformat(),
+                "view": view_name,
+                "status": status,
+                "queries": stats.count,
+                "db_ms": round(stats.duration * 1000, 3),
+                "slowest_ms": round(stats.slowest_duration * 1000, 3),
+                "slowest_sql": stats.slowest_sql,
+                "budget": budget,
+            }
+        )
+    )
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize_samples(samples):
+    """
+    Per-view summary of query samples: request count, mean/p95/max queries,
+    mean/max database time, requests over budget and the slowest statement.
+    """
+    views = {}
+    for sample in samples:
+        views.setdefault(sample["view"], []).append(sample)
+    summary = []
+    for view_name, rows in views.items():
+        queries = [row["queries"] for row in rows]
+        db_ms = [row["db_ms"] for row in rows]
+        slowest = max(rows, key=lambda row: row["slowest_ms"])
+        budget = rows[-1].get("budget")
+        summary.append(
+            {
+                "view": view_name,
+                "requests": len(rows),
+                "queries_mean": sum(queries) / len(rows),
+                "queries_p95": _percentile(queries, 0.95),
+                "queries_max": max(queries),
+                "db_ms_mean": sum(db_ms) / len(rows),
+                "db_ms_max": max(db_ms),
+                "budget": budget,
+                "over_budget": sum(
+                    1
+                    for row in rows
+                    if row.get("budget") is not None and row["queries"] > row["budget"]
+                ),
+                "slowest_ms": slowest["slowest_ms"],
+                "slowest_sql": slowest["slowest_sql"],
+            }
+        )
+    return summary
+
+
+class QueryStatsMiddleware:
+    """
+    Count the queries and database time of every routed request, keyed by URL
+    name, record a sample for the querystats command and enforce the view's
+    QUERY_BUDGETS entry. Queries run while a streaming response is consumed
+    happen after the middleware returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with capture_queries() as stats:
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return response
+        view_name = match.view_name or match.route
+        if settings.QUERY_STATS_ENABLED:
+            record_sample(view_name, stats, response.status_code)
+        check_budget(view_name, stats)
+        return response
@@ -0,0 +1,252 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils.dateparse import parse_date
+from django.utils.timezone import make_aware
+
+from .models import ArchivedLead, ArchivedQuote, DailyRevenue, Lead, Order, Quote
+from .routers import replica_cache_timeout
+
+# Model, date field and exported columns for each section of the CSV export
+EXPORT_SECTIONS = {
+    "orders": (Order, "date", ("id", "date", "status", "amount")),
+    "leads": (
+        Lead,
+        "created_at",
+        ("id", "created_at", "name", "email", "phone", "service", "status"),
+    ),
+    "quotes": (
+        Quote,
+        "created_at",
+        ("id", "created_at", "name", "email", "phone", "details"),
+    ),
+}
+# Archive tables exported ahead of their section's hot rows. Archived rows are
+# all older than the hot ones, so the export stays in (date, id) order.
+EXPORT_ARCHIVES = {"leads": ArchivedLead, "quotes": ArchivedQuote}
+EXPORT_CHUNK_SIZE = 2000
+
+REPORT_CACHE_TIMEOUT = 60 * 60
+# Cached reports are keyed by versions that invalidate_reports() bumps: every
+# change bumps REPORT_VERSION_KEY, which open and long ranges are keyed by;
+# ranges of up to REPORT_MONTH_VERSIONS months are keyed by the version of
+# each month they cover plus REPORT_RESET_KEY, bumped when all reports go.
+REPORT_VERSION_KEY = "reports:version"
+REPORT_RESET_KEY = "reports:version:reset"
+REPORT_MONTH_VERSIONS = 12
+# Ranges up to this many days are broken down by day, longer ones by month
+REPORT_DAILY_MAX_DAYS = 31
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def parse_report_range(params):
+    """
+    Read ``start_date`` and ``end_date`` (YYYY-MM-DD, both optional) from
+    query parameters. Raises ValueError for malformed or reversed dates.
+    """
+    dates = []
+    for name in ("start_date", "end_date"):
+        value = params.get(name)
+        day = None
+        if value:
+            try:
+                day = parse_date(value)
+            except ValueError:
+                pass
+            if day is None:
+                raise ValueError("Dates must be in YYYY-MM-DD format.")
+        dates.append(day)
+    start, end = dates
+    if start and end and start > end:
+        raise ValueError("Start date must not be after end date.")
+    return start, end
+
+
+def range_filter(model, field, start=None, end=None):
+    """
+    Lookups selecting ``start``..``end`` (inclusive days) on a date or datetime
+    field. Datetimes are compared against midnights rather than with __date so
+    the column's index stays usable.
+    """
+    lookups = {}
+    is_datetime = model._meta.get_field(field).get_internal_type() == "DateTimeField"
+    if start:
+        lookups[f"{field}__gte"] = (
+            make_aware(datetime.combine(start, time.min)) if is_datetime else start
+        )
+    if end:
+        if is_datetime:
+            lookups[f"{field}__lt"] = make_aware(
+                datetime.combine(end + timedelta(days=1), time.min)
+            )
+        else:
+            lookups[f"{field}__lte"] = end
+    return lookups
+
+
+def export_rows(start=None, end=None, sections=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the CSV rows of the export, one titled section per model.
+
+    Rows are read with values_list and iterator(), so only ``chunk_size`` rows
+    are held in memory at a time.
+    """
+    for index, name in enumerate(sections or EXPORT_SECTIONS):
+        model, field, columns = EXPORT_SECTIONS[name]
+        if index:
+            yield []
+        yield [name.title()]
+        yield [column.replace("_", " ").title() for column in columns]
+        for source in filter(None, (EXPORT_ARCHIVES.get(name), model)):
+            queryset = (
+                source._default_manager.filter(
+                    **range_filter(source, field, start, end)
+                )
+                .order_by(field, "id")
+                .values_list(*columns)
+            )
+            yield from queryset.iterator(chunk_size=chunk_size)
+
+
+def stream_csv(rows):
+    """Encode rows lazily as CSV lines for a StreamingHttpResponse."""
+    writer = csv.writer(Echo())
+    return (writer.writerow(row) for row in rows)
+
+
+def _month_version_key(day):
+    return f"reports:version:{day:%Y-%m}"
+
+
+def _months(start, end):
+    """The first day of every month from ``start`` to ``end``."""
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def report_version_keys(start=None, end=None):
+    """The cache keys of the versions that reports of ``start``..``end`` follow."""
+    if start and end and start <= end:
+        months = list(_months(start, end))
+        if len(months) <= REPORT_MONTH_VERSIONS:
+            return [REPORT_RESET_KEY, *map(_month_version_key, months)]
+    return [REPORT_VERSION_KEY]
+
+
+def _report_key(start, end):
+    keys = report_version_keys(start, end)
+    versions = cache.get_many(keys)
+    version = ".".join(str(versions.get(key, 0)) for key in keys)
+    return f"reports:{version}:{start or '*'}:{end or '*'}"
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def build_report(start=None, end=None):
+    """
+    Aggregates for the reports page between ``start`` and ``end`` (inclusive,
+    either may be None for an open range).
+
+    Computed in two queries from the DailyRevenue rollup and the Lead table,
+    then cached per range until an order or lead inside it changes.
+    """
+    # The key is read before computing, so a change made meanwhile bumps a
+    # version and the result is stored under an already-stale key
+    key = _report_key(start, end)
+    report = cache.get(key)
+    if report is not None:
+        return report
+    report = compute_report(start, end)
+    cache.set(key, report, replica_cache_timeout(REPORT_CACHE_TIMEOUT))
+    return report
+
+
+def compute_report(start=None, end=None):
+    daily = start and end and (end - start).days < REPORT_DAILY_MAX_DAYS
+    trunc = TruncDay if daily else TruncMonth
+    revenue = DailyRevenue.objects.filter(
+        **range_filter(DailyRevenue, "date", start, end)
+    )
+    leads = [
+        model._default_manager.filter(**range_filter(model, "created_at", start, end))
+        .annotate(period=trunc("created_at", output_field=DateField()))
+        .values("period")
+        .annotate(count=Count("id"))
+        .order_by()
+        .values_list("period", "count")
+        for model in (Lead, ArchivedLead)
+    ]
+
+    periods = {
+        row["period"]: row
+        for row in revenue.annotate(period=trunc("date"))
+        .values("period")
+        .annotate(
+            revenue=Sum("total"),
+            orders=Sum("order_count"),
+            pending=Sum("order_count", filter=Q(status="pending")),
+        )
+        .order_by()
+    }
+    # Hot and archived leads in one UNION ALL query
+    new_leads = {}
+    for period, count in leads[0].union(leads[1], all=True):
+        new_leads[period] = new_leads.get(period, 0) + count
+
+    report_data = []
+    for period in sorted(set(periods) | set(new_leads)):
+        row = periods.get(period, {})
+        orders, pending = row.get("orders") or 0, row.get("pending") or 0
+        revenue_total = row.get("revenue") or 0
+        lead_count = new_leads.get(period, 0)
+        report_data.append(
+            {
+                "title": period.isoformat() if daily else period.strftime("%B %Y"),
+                "details": (
+                    f"{orders} orders ({pending} pending), "
+                    f"${revenue_total:,.2f} revenue, {lead_count} new leads"
+                ),
+                "created_at": make_aware(datetime.combine(period, time.min)),
+                "revenue": revenue_total,
+                "orders": orders,
+                "pending_orders": pending,
+                "leads": lead_count,
+            }
+        )
+    return {
+        "total_revenue": sum(row["revenue"] or 0 for row in periods.values()),
+        "total_orders": sum(row["orders"] or 0 for row in periods.values()),
+        "pending_orders": sum(row["pending"] or 0 for row in periods.values()),
+        "total_customers": sum(new_leads.values()),
+        "report_data": report_data,
+    }
+
+
+def invalidate_reports(*days):
+    """
+    Drop the cached reports whose range covers any of ``days``, or all of
+    them when no day is given, by bumping their versions; open and longer
+    ranges are dropped on every change. Snapshots record the versions they
+    were built at, so the same bumps make covering snapshots stale.
+    """
+    _bump(REPORT_VERSION_KEY)
+    if not days:
+        _bump(REPORT_RESET_KEY)
+    for key in {_month_version_key(day) for day in days}:
+        _bump(key)
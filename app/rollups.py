@@ -0,0 +1,182 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek
+from django.utils.timezone import now
+
+from .models import DailyRevenue, MonthlyRevenue, Order
+from .reports import invalidate_reports
+from .routers import replica_cache_timeout
+
+REVENUE_BUCKETS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+    "quarter": TruncQuarter,
+}
+REVENUE_CACHE_TIMEOUT = 60 * 60
+REVENUE_CACHE_VERSION_KEY = "revenue_series:version"
+
+
+def apply_order_delta(order_date, status, amount, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) a single order from the revenue rollups.
+    """
+    if order_date is None or amount is None:
+        return
+    # Values assigned on an unsaved instance may still be strings.
+    order_date = Order._meta.get_field("date").to_python(order_date)
+    amount = Order._meta.get_field("amount").to_python(amount)
+    with transaction.atomic():
+        MonthlyRevenue.objects.get_or_create(
+            year=order_date.year, month=order_date.month, status=status
+        )
+        MonthlyRevenue.objects.filter(
+            year=order_date.year, month=order_date.month, status=status
+        ).update(
+            total=F("total") + sign * amount,
+            order_count=F("order_count") + sign,
+        )
+        DailyRevenue.objects.get_or_create(date=order_date, status=status)
+        DailyRevenue.objects.filter(date=order_date, status=status).update(
+            total=F("total") + sign * amount,
+            order_count=F("order_count") + sign,
+        )
+    invalidate_revenue_cache()
+    invalidate_reports(order_date)
+
+
+def rebuild_revenue_rollups():
+    """
+    Recompute every rollup row from the Order table.
+
+    Returns the number of monthly and daily rollup rows written.
+    """
+    monthly, daily = {}, {}
+    for order_date, status, amount in Order.objects.values_list(
+        "date", "status", "amount"
+    ).iterator():
+        for buckets, key in (
+            (monthly, (order_date.year, order_date.month, status)),
+            (daily, (order_date, status)),
+        ):
+            total, count = buckets.get(key, (0, 0))
+            buckets[key] = (total + amount, count + 1)
+
+    monthly_rows = [
+        MonthlyRevenue(
+            year=year, month=month, status=status, total=total, order_count=count
+        )
+        for (year, month, status), (total, count) in monthly.items()
+    ]
+    daily_rows = [
+        DailyRevenue(date=order_date, status=status, total=total, order_count=count)
+        for (order_date, status), (total, count) in daily.items()
+    ]
+    with transaction.atomic():
+        MonthlyRevenue.objects.all().delete()
+        MonthlyRevenue.objects.bulk_create(monthly_rows)
+        DailyRevenue.objects.all().delete()
+        DailyRevenue.objects.bulk_create(daily_rows)
+    invalidate_revenue_cache()
+    invalidate_reports()
+    return len(monthly_rows), len(daily_rows)
+
+
+def monthly_revenue(year, month):
+    """Total revenue for one calendar month, across all statuses."""
+    return (
+        MonthlyRevenue.objects.filter(year=year, month=month).aggregate(
+            total=Sum("total")
+        )["total"]
+        or 0
+    )
+
+
+def order_count(start=None, end=None, status=None):
+    """
+    Number of orders in an optional date range and status, read from the
+    DailyRevenue rollup instead of counting Order rows.
+    """
+    rows = DailyRevenue.objects.all()
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+    if status:
+        rows = rows.filter(status=status)
+    return rows.aggregate(count=Sum("order_count"))["count"] or 0
+
+
+def sales_chart(months=12):
+    """
+    Labels and totals for the trailing ``months`` calendar months, oldest first.
+    """
+    today = now().date()
+    periods = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        periods.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    periods.reverse()
+
+    first_year, first_month = periods[0]
+    totals = {
+        (row["year"], row["month"]): row["total"]
+        for row in MonthlyRevenue.objects.filter(year__gte=first_year)
+        .values("year", "month")
+        .annotate(total=Sum("total"))
+        .order_by()
+    }
+    labels = [f"{year}-{month:02d}" for year, month in periods]
+    data = [float(totals.get(period, 0)) for period in periods]
+    return labels, data
+
+
+def invalidate_revenue_cache():
+    """Drop every cached revenue series by moving to a new cache version."""
+    try:
+        cache.incr(REVENUE_CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(REVENUE_CACHE_VERSION_KEY, 1, None)
+
+
+def _period_label(period_start, bucket):
+    if bucket == "month":
+        return period_start.strftime("%Y-%m")
+    if bucket == "quarter":
+        return f"{period_start.year}-Q{(period_start.month - 1) // 3 + 1}"
+    return period_start.isoformat()
+
+
+def revenue_series(start, end, bucket="month", status=None):
+    """
+    Revenue between ``start`` and ``end`` (inclusive) grouped into ``bucket``.
+
+    The series is aggregated from the DailyRevenue rollup and cached per
+    range until an order changes.
+    """
+    trunc = REVENUE_BUCKETS[bucket]
+    version = cache.get(REVENUE_CACHE_VERSION_KEY, 0)
+    key = f"revenue_series:{version}:{start}:{end}:{bucket}:{status or 'all'}"
+    series = cache.get(key)
+    if series is not None:
+        return series
+
+    rows = DailyRevenue.objects.filter(date__range=(start, end))
+    if status:
+        rows = rows.filter(status=status)
+    series = [
+        {
+            "period": _period_label(row["period"], bucket),
+            "start": row["period"].isoformat(),
+            "total": row["total"],
+            "orders": row["orders"],
+        }
+        for row in rows.annotate(period=trunc("date"))
+        .values("period")
+        .annotate(total=Sum("total"), orders=Sum("order_count"))
+        .order_by("period")
+    ]
+    cache.set(key, series, replica_cache_timeout(REVENUE_CACHE_TIMEOUT))
+    return series
@@ -0,0 +1,189 @@
+import contextvars
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA_ALIAS = "replica"
+# Set on responses to requests that wrote, so the same client keeps reading
+# its own writes from the primary until the replica has caught up
+PRIMARY_PIN_COOKIE = "read_primary"
+
+
+class ReplicaState:
+    def __init__(self, pinned=False):
+        self.use_replica = False
+        self.pinned = pinned
+        self.wrote = False
+        self._fresh = None
+
+    @property
+    def replica_fresh(self):
+        """replica_is_fresh(), checked once per request rather than per query."""
+        if self._fresh is None:
+            self._fresh = replica_is_fresh()
+        return self._fresh
+
+
+_state = contextvars.ContextVar("replica_state", default=None)
+
+
+def _database_path(alias):
+    return str(connections[alias].settings_dict["NAME"])
+
+
+def replica_marker_path(replica_path=None):
+    """File whose mtime records when the replica's last copy was started."""
+    return f"{replica_path or _database_path(REPLICA_ALIAS)}.refreshed"
+
+
+def replica_lag():
+    """Seconds since the replica was last refreshed, or None if it never was."""
+    if REPLICA_ALIAS not in connections:
+        return None
+    try:
+        return time.time() - os.path.getmtime(replica_marker_path())
+    except OSError:
+        return None
+
+
+def replica_is_fresh():
+    lag = replica_lag()
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG
+
+
+def refresh_replica(primary_path=None, replica_path=None):
+    """
+    Copy the primary database into the replica with SQLite's online backup
+    API, which works while the primary is in use. Returns the seconds taken.
+    """
+    primary_path = primary_path or _database_path("default")
+    replica_path = replica_path or _database_path(REPLICA_ALIAS)
+    # The copy holds nothing newer than this, however long the backup takes
+    copied_at = time.time()
+    started = time.monotonic()
+    primary = sqlite3.connect(primary_path)
+    replica = sqlite3.connect(replica_path)
+    try:
+        # Retries on its own while replica readers hold a lock
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+    marker = replica_marker_path(replica_path)
+    with open(marker, "w"):
+        pass
+    os.utime(marker, (copied_at, copied_at))
+    return time.monotonic() - started
+
+
+def reading_from_replica():
+    """Whether reads in the current context go to the replica."""
+    state = _state.get()
+    return (
+        state is not None
+        and state.use_replica
+        and not (state.pinned or state.wrote)
+        and state.replica_fresh
+    )
+
+
+def replica_cache_timeout(timeout):
+    """
+    Cap a cache timeout at REPLICA_MAX_LAG while reads come from the replica,
+    so a value computed from stale data cannot outlive the allowed lag.
+    """
+    if not reading_from_replica():
+        return timeout
+    if timeout is None:
+        return settings.REPLICA_MAX_LAG
+    return min(timeout, settings.REPLICA_MAX_LAG)
+
+
+@contextmanager
+def replica_reads():
+    """Route the reads inside the block to the replica while it is fresh."""
+    state = _state.get()
+    token = None
+    if state is None:
+        token = _state.set(ReplicaState())
+        state = _state.get()
+    previous = state.use_replica
+    state.use_replica = True
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+        if token is not None:
+            _state.reset(token)
+
+
+def read_from_replica(view):
+    """View decorator sending the view's reads to the replica."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Send reads of this app's models made inside replica_reads() to the
+    read-only replica while its lag is within REPLICA_MAX_LAG. Every write
+    goes to the primary, and once a request has written, its remaining reads
+    do too.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Sessions and users are always read from the primary so a fresh login
+        # is never lost to replica lag
+        if model._meta.app_label == "app" and reading_from_replica():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary with each refresh
+        return False if db == REPLICA_ALIAS else None
+
+
+class ReplicaMiddleware:
+    """
+    Track writes and replica freshness per request for ReplicaRouter, and keep
+    a client that just wrote on the primary for REPLICA_MAX_LAG seconds.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = ReplicaState(pinned=PRIMARY_PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                "1",
+                max_age=max(int(settings.REPLICA_MAX_LAG), 1),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
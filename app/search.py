@@ -0,0 +1,169 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.expressions import RawSQL
+
+from .models import Lead, Message, Quote
+
+# Columns indexed for each model; the FTS rowid is the model's primary key.
+SEARCH_FIELDS = {
+    Lead: ("name", "email", "phone", "service"),
+    Quote: ("name", "email", "details"),
+    Message: ("subject", "content"),
+}
+
+TOKEN_RE = re.compile(r"\w[\w.@+-]*", re.UNICODE)
+
+# Upper bound on ranked results returned to the custom admin pages
+SEARCH_LIMIT = 200
+
+
+def fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+def index_instance(instance):
+    """Insert or refresh one row in its model's FTS table."""
+    if not fts_enabled():
+        return
+    model = type(instance)
+    fields = SEARCH_FIELDS[model]
+    values = [getattr(instance, field) or "" for field in fields]
+    placeholders = ", ".join(["%s"] * (len(fields) + 1))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {fts_table(model)} (rowid, {', '.join(fields)}) "
+            f"VALUES ({placeholders})",
+            [instance.pk, *values],
+        )
+
+
+def unindex_instance(instance):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {fts_table(type(instance))} WHERE rowid = %s", [instance.pk]
+        )
+
+
+def index_queryset(queryset):
+    """Insert or refresh the FTS rows for every row of ``queryset`` in one statement."""
+    if not fts_enabled():
+        return
+    model = queryset.model
+    fields = SEARCH_FIELDS[model]
+    sql, params = queryset.values_list("pk", *fields).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {fts_table(model)} (rowid, {', '.join(fields)}) "
+            f"{sql}",
+            params,
+        )
+
+
+def unindex_queryset(queryset):
+    """Remove the FTS rows for every row of ``queryset`` in one statement."""
+    if not fts_enabled():
+        return
+    sql, params = queryset.values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {fts_table(queryset.model)} WHERE rowid IN ({sql})", params
+        )
+
+
+def rebuild_search_index(model, batch_size=1000):
+    """Rebuild one model's FTS table from scratch. Returns the rows indexed."""
+    if not fts_enabled():
+        return 0
+    fields = SEARCH_FIELDS[model]
+    table = fts_table(model)
+    placeholders = ", ".join(["%s"] * (len(fields) + 1))
+    insert = f"INSERT INTO {table} (rowid, {', '.join(fields)}) VALUES ({placeholders})"
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        rows = model._default_manager.values_list("pk", *fields).iterator(
+            chunk_size=batch_size
+        )
+        batch = []
+        for row in rows:
+            batch.append([row[0], *(value or "" for value in row[1:])])
+            if len(batch) >= batch_size:
+                cursor.executemany(insert, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+            count += len(batch)
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+    return count
+
+
+def build_match_query(term):
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    tokens = TOKEN_RE.findall(term or "")
+    return " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def _fallback_condition(model, term):
+    return reduce(
+        or_, (Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS[model])
+    )
+
+
+def search_ids(model, term, limit=SEARCH_LIMIT):
+    """Primary keys of ``model`` rows matching ``term``, best match first."""
+    match = build_match_query(term)
+    if not match:
+        return []
+    if not fts_enabled():
+        queryset = model._default_manager.filter(_fallback_condition(model, term))
+        return list(queryset.values_list("pk", flat=True)[:limit])
+    table = fts_table(model)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(queryset, term, limit=SEARCH_LIMIT):
+    """
+    Filter ``queryset`` to the best ``limit`` rows matching ``term``, ordered
+    by relevance.
+    """
+    ids = search_ids(queryset.model, term, limit)
+    if not ids:
+        return queryset.none()
+    ranking = Case(
+        *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=ids).order_by(ranking)
+
+
+def search_filter(queryset, term):
+    """
+    Filter ``queryset`` to every row matching ``term`` without ranking, using
+    the FTS table as a subquery.
+    """
+    model = queryset.model
+    match = build_match_query(term)
+    if not match:
+        return queryset.none()
+    if not fts_enabled():
+        return queryset.filter(_fallback_condition(model, term))
+    table = fts_table(model)
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])
+    )
@@ -0,0 +1,114 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.timezone import localdate
+
+from .counters import adjust_counter
+from .models import Lead, Message, Order, Project, Quote
+from .projects import invalidate_popular_window_styles
+from .reports import invalidate_reports
+from .rollups import apply_order_delta
+from .search import index_instance, unindex_instance
+from .sqlite import configure_connection
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    # Runs once per new connection, not once per request
+    configure_connection(connection)
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_order(sender, instance, raw=False, **kwargs):
+    """Keep the stored values so post_save can move the order between rollups."""
+    instance._previous_rollup = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_rollup = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("date", "status", "amount")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Order)
+def update_revenue_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_rollup", None)
+    if previous is not None:
+        apply_order_delta(*previous, sign=-1)
+    apply_order_delta(instance.date, instance.status, instance.amount)
+
+
+@receiver(post_delete, sender=Order)
+def update_revenue_on_delete(sender, instance, **kwargs):
+    apply_order_delta(instance.date, instance.status, instance.amount, sign=-1)
+
+
+@receiver(post_save, sender=Lead)
+@receiver(post_save, sender=Quote)
+@receiver(post_save, sender=Message)
+def update_search_index(sender, instance, **kwargs):
+    # Soft-deleted leads drop out of search
+    if getattr(instance, "is_active", True):
+        index_instance(instance)
+    else:
+        unindex_instance(instance)
+
+
+@receiver(post_delete, sender=Lead)
+@receiver(post_delete, sender=Quote)
+@receiver(post_delete, sender=Message)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_instance(instance)
+
+
+@receiver(post_save, sender=Lead)
+def update_lead_counters(sender, instance, created, **kwargs):
+    # The lead counters only count active leads
+    previous = getattr(instance, "_loaded_status", None)
+    was_active = getattr(instance, "_loaded_is_active", None)
+    if created:
+        was_active, previous = False, None
+    if was_active is not None:
+        is_new = instance.is_active and instance.status == "new"
+        adjust_counter("total_leads", int(instance.is_active) - int(was_active))
+        adjust_counter("new_leads", int(is_new) - int(was_active and previous == "new"))
+        if instance.is_active != was_active:
+            invalidate_reports(localdate(instance.created_at))
+    instance._loaded_status = instance.status
+    instance._loaded_is_active = instance.is_active
+
+
+@receiver(post_delete, sender=Lead)
+def update_lead_counters_on_delete(sender, instance, **kwargs):
+    # A soft-deleted lead was already taken off the counters
+    if not instance.is_active:
+        return
+    adjust_counter("total_leads", -1)
+    adjust_counter("new_leads", -int(instance.status == "new"))
+    invalidate_reports(localdate(instance.created_at))
+
+
+@receiver(post_save, sender=Message)
+def update_message_counters(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_is_read", None)
+    if created:
+        adjust_counter("total_messages", 1)
+        adjust_counter("unread_messages", int(not instance.is_read))
+    elif previous is not None and previous != instance.is_read:
+        adjust_counter("unread_messages", -1 if instance.is_read else 1)
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Message)
+def update_message_counters_on_delete(sender, instance, **kwargs):
+    adjust_counter("total_messages", -1)
+    adjust_counter("unread_messages", -int(not instance.is_read))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def update_popular_window_styles(sender, instance, **kwargs):
+    invalidate_popular_window_styles()
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import re
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.utils.timezone import now
+
+from .querystats import wrap_all_connections
+
+logger = logging.getLogger(__name__)
+# One JSON object per slow statement, written by the LOGGING handler
+entry_logger = logging.getLogger("app.slowqueries.entries")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+# "SCAN app_lead" ("SCAN TABLE" before SQLite 3.36) reads the whole table,
+# where "SEARCH" seeks into an index. A SCAN "USING [COVERING] INDEX" or
+# "USING INTEGER PRIMARY KEY" walks an index in order: still a full pass,
+# unless a LIMIT stops it early, as on a keyset page.
+_TABLE_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_INDEX_WALK_RE = re.compile(r"\bUSING (?:COVERING INDEX|INDEX|INTEGER PRIMARY KEY)\b")
+_LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """
+    Reduce a statement to its shape: literals and parameters become ``?``,
+    IN lists collapse to ``(?)`` and whitespace is folded.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_LIST_RE.sub("(?)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    """Short stable identifier for the normalized form of ``sql``."""
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+def explain_query_plan(connection, sql, params):
+    """
+    SQLite's EXPLAIN QUERY PLAN for ``sql``, one line per plan step, or None
+    for other databases and statements that cannot be explained.
+    """
+    if connection.vendor != "sqlite":
+        return None
+    # A raw cursor keeps the EXPLAIN out of the execute wrappers and leaves the
+    # original statement's cursor untouched
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        logger.debug("Could not explain slow query: %s", e)
+        return None
+    finally:
+        cursor.close()
+
+
+def _scans(plan):
+    """(model label, walks an index) for each SCAN step of ``plan``."""
+    tables = {model._meta.db_table: model._meta.label for model in apps.get_models()}
+    for line in plan or ():
+        match = _TABLE_SCAN_RE.match(line.strip())
+        if match and match.group(1) in tables:
+            yield tables[match.group(1)], bool(_INDEX_WALK_RE.search(line))
+
+
+def table_scans(plan):
+    """Labels of the models whose table is read in full in ``plan``."""
+    return [label for label, index_walk in _scans(plan) if not index_walk]
+
+
+def index_scans(plan, sql):
+    """
+    Labels of the models whose table is read in full through an index in
+    ``plan``. Walks cut short by a LIMIT in ``sql`` are not counted.
+    """
+    if _LIMIT_RE.search(sql):
+        return []
+    return [label for label, index_walk in _scans(plan) if index_walk]
+
+
+class SlowQueryLogger:
+    """
+    Execute wrapper that records every statement slower than
+    SLOW_QUERY_THRESHOLD_MS with its parameters, the calling view and the
+    query plan captured right after it ran.
+    """
+
+    def __init__(self, request=None, threshold_ms=None):
+        self.request = request
+        self.threshold = (
+            settings.SLOW_QUERY_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        ) / 1000
+
+    def view_name(self):
+        if self.request is None:
+            return None
+        match = getattr(self.request, "resolver_match", None)
+        if match is None:
+            return self.request.path
+        return match.view_name or match.route
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold:
+                self.record(context["connection"], sql, params, many, elapsed)
+
+    def record(self, connection, sql, params, many, elapsed):
+        plan = None if many else explain_query_plan(connection, sql, params)
+        entry_logger.info(
+            json.dumps(
+                {
+                    "time": now().isoformat(),
+                    "view": self.view_name(),
+                    "database": connection.alias,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "fingerprint": fingerprint(sql),
+                    "sql": sql,
+                    # executemany parameter lists can be huge; keep the first row
+                    "params": list(params[0] if many and params else params or ()),
+                    "plan": plan,
+                },
+                default=str,
+            )
+        )
+
+
+def summarize_slow_queries(entries):
+    """
+    Group slow query log entries by SQL fingerprint, slowest total time first.
+    """
+    groups = {}
+    for entry in entries:
+        key = entry.get("fingerprint") or fingerprint(entry["sql"])
+        group = groups.setdefault(
+            key,
+            {
+                "fingerprint": key,
+                "sql": normalize_sql(entry["sql"]),
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "views": set(),
+                "scans": set(),
+                "index_scans": set(),
+                "plan": entry.get("plan"),
+            },
+        )
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        if entry["duration_ms"] >= group["max_ms"]:
+            group["max_ms"] = entry["duration_ms"]
+            group["plan"] = entry.get("plan") or group["plan"]
+        if entry.get("view"):
+            group["views"].add(entry["view"])
+        group["scans"].update(table_scans(entry.get("plan")))
+        group["index_scans"].update(index_scans(entry.get("plan"), entry["sql"]))
+    return sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)
+
+
+class SlowQueryMiddleware:
+    """Log the slow statements of every request with SlowQueryLogger."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SLOW_QUERY_LOG_ENABLED:
+            return self.get_response(request)
+        with wrap_all_connections(SlowQueryLogger(request)):
+            return self.get_response(request)
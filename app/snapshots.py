@@ -0,0 +1,222 @@
+import json
+import os
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Sum
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import DailyRevenue, Lead
+from .reports import (
+    build_report,
+    compute_report,
+    export_rows,
+    range_filter,
+    report_version_keys,
+    stream_csv,
+)
+
+SNAPSHOT_PERIODS = ("daily", "weekly", "monthly")
+SNAPSHOT_KEEP = 60
+
+
+def snapshot_range(period, today):
+    """The last complete day, Monday-Sunday week or month before ``today``."""
+    if period == "daily":
+        day = today - timedelta(days=1)
+        return day, day
+    if period == "weekly":
+        end = today - timedelta(days=today.weekday() + 1)
+        return end - timedelta(days=6), end
+    end = today.replace(day=1) - timedelta(days=1)
+    return end.replace(day=1), end
+
+
+def snapshot_path(period, start, end, extension):
+    return os.path.join(
+        settings.REPORTS_SNAPSHOT_DIR, period, f"{start}_{end}.{extension}"
+    )
+
+
+def find_snapshot(start, end, extension="json"):
+    """
+    Path of the current snapshot covering exactly ``start``..``end``, if one
+    exists.
+    """
+    snapshot = _current_snapshot(start, end)
+    if snapshot is None:
+        return None
+    return snapshot_path(snapshot[0], start, end, extension)
+
+
+def _current_snapshot(start, end):
+    """The (period, report) of the current snapshot of ``start``..``end``."""
+    if not (start and end):
+        return None
+    for period in SNAPSHOT_PERIODS:
+        path = snapshot_path(period, start, end, "json")
+        if os.path.exists(path):
+            report = load_snapshot(path)
+            if _is_current(report):
+                return period, report
+    return None
+
+
+def _is_current(report):
+    """
+    Whether no order or lead in a snapshot's range has changed since it was
+    built: the report versions it recorded must all still be in the cache
+    unchanged, so a cleared cache makes every snapshot stale.
+    """
+    versions = report.get("versions")
+    return bool(versions) and cache.get_many(list(versions)) == versions
+
+
+def _write_atomic(path, chunks):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+    with open(partial, "w", newline="", encoding="utf-8") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+    os.replace(partial, path)
+
+
+def write_snapshot(period, start, end):
+    """
+    Precompute the report and CSV export for one range and write them under
+    REPORTS_SNAPSHOT_DIR. The database is only read, never written.
+
+    The report versions of the range are recorded before computing, so a
+    change made meanwhile leaves the snapshot stale rather than wrong.
+    """
+    keys = report_version_keys(start, end)
+    for key in keys:
+        cache.add(key, 0, None)
+    versions = cache.get_many(keys)
+    rollup = DailyRevenue.objects.filter(
+        **range_filter(DailyRevenue, "date", start, end)
+    )
+    leads = Lead._default_manager.filter(**range_filter(Lead, "created_at", start, end))
+    report = compute_report(start, end)
+    report.update(
+        period=period,
+        start=start,
+        end=end,
+        versions=versions,
+        orders_by_status=dict(
+            rollup.values("status")
+            .annotate(count=Sum("order_count"))
+            .order_by()
+            .values_list("status", "count")
+        ),
+        lead_funnel=dict(
+            leads.values("status")
+            .annotate(count=Count("id"))
+            .order_by()
+            .values_list("status", "count")
+        ),
+    )
+    _write_atomic(
+        snapshot_path(period, start, end, "json"),
+        [json.dumps(report, cls=DjangoJSONEncoder)],
+    )
+    _write_atomic(
+        snapshot_path(period, start, end, "csv"), stream_csv(export_rows(start, end))
+    )
+    return report
+
+
+def load_snapshot(path):
+    """Read a snapshot report back with its Decimal and datetime values restored."""
+    with open(path, encoding="utf-8") as handle:
+        report = json.load(handle)
+    report["total_revenue"] = Decimal(report["total_revenue"])
+    report["start"] = parse_date(report["start"])
+    report["end"] = parse_date(report["end"])
+    for row in report["report_data"]:
+        row["revenue"] = Decimal(row["revenue"])
+        row["created_at"] = parse_datetime(row["created_at"])
+    return report
+
+
+def get_report(start=None, end=None):
+    """
+    The report for a range: the current snapshot when one matches it
+    exactly, otherwise a live (cached) computation.
+    """
+    snapshot = _current_snapshot(start, end)
+    if snapshot is not None:
+        return snapshot[1]
+    return build_report(start, end)
+
+
+def default_report():
+    """
+    The report shown when no range is asked for: the newest current snapshot
+    (the latest end date, the longest period on ties), or the live all-time
+    report when there is none.
+    """
+    snapshots = sorted(
+        latest_snapshots(),
+        key=lambda snapshot: (snapshot[2], snapshot[2] - snapshot[1]),
+        reverse=True,
+    )
+    for period, start, end in snapshots:
+        report = load_snapshot(snapshot_path(period, start, end, "json"))
+        if _is_current(report):
+            return report
+    return build_report()
+
+
+def latest_snapshots():
+    """The newest snapshot range of each period, as (period, start, end)."""
+    latest = []
+    for period in SNAPSHOT_PERIODS:
+        names = _snapshot_names(period)
+        if names:
+            start, end = names[-1].split("_")
+            latest.append((period, parse_date(start), parse_date(end)))
+    return latest
+
+
+def _snapshot_names(period):
+    directory = os.path.join(settings.REPORTS_SNAPSHOT_DIR, period)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name[: -len(".json")]
+        for name in os.listdir(directory)
+        if name.endswith(".json")
+    )
+
+
+def _remove_snapshot(period, name):
+    for extension in ("json", "csv"):
+        path = os.path.join(
+            settings.REPORTS_SNAPSHOT_DIR, period, f"{name}.{extension}"
+        )
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def prune_snapshots(period, keep=SNAPSHOT_KEEP):
+    """
+    Delete the stale snapshots of ``period`` and all but the newest ``keep``
+    of the rest.
+    """
+    names = []
+    removed = 0
+    for name in _snapshot_names(period):
+        path = os.path.join(settings.REPORTS_SNAPSHOT_DIR, period, f"{name}.json")
+        if _is_current(load_snapshot(path)):
+            names.append(name)
+        else:
+            _remove_snapshot(period, name)
+            removed += 1
+    for name in names[: max(len(names) - keep, 0)]:
+        _remove_snapshot(period, name)
+        removed += 1
+    return removed
@@ -0,0 +1,56 @@
+import re
+
+from django.conf import settings
+
+# Applied to every new SQLite connection; override any of them with
+# settings.SQLITE_PRAGMAS.
+DEFAULT_SQLITE_PRAGMAS = {
+    # Readers no longer block behind the writer, and vice versa
+    "journal_mode": "wal",
+    # Wait this many milliseconds for a lock instead of failing at once
+    "busy_timeout": 5000,
+    # Safe with WAL; fsync at checkpoints instead of every commit
+    "synchronous": "normal",
+    "mmap_size": 128 * 1024 * 1024,
+    # Negative values are KiB, so about 20 MB of page cache
+    "cache_size": -20000,
+    "temp_store": "memory",
+}
+
+PRAGMA_VALUE_RE = re.compile(r"^-?\w+$")
+
+
+def sqlite_pragmas(overrides=None):
+    """
+    The pragmas to apply: the defaults updated with the non-None values of
+    ``overrides`` (settings.SQLITE_PRAGMAS by default).
+    """
+    if overrides is None:
+        overrides = getattr(settings, "SQLITE_PRAGMAS", {})
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    pragmas.update(
+        (name, value) for name, value in overrides.items() if value is not None
+    )
+    return pragmas
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not (name.isidentifier() and PRAGMA_VALUE_RE.match(str(value))):
+            raise ValueError(f"Invalid SQLite pragma: {name}={value!r}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+
+def apply_pragmas(cursor, pragmas):
+    for statement in pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure_connection(connection):
+    """Apply the SQLite pragmas to a newly opened database connection."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, sqlite_pragmas())
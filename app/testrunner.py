@@ -0,0 +1,35 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner that gives the test run its own file-based cache
+    directory, so tests neither see nor clear the cache of a running site,
+    and turns off the query stats samples and the slow query log so a run
+    leaves nothing in logs/. Tests of that instrumentation enable it with
+    override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix="test_cache_")
+        self.test_settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir,
+                }
+            },
+            QUERY_STATS_ENABLED=False,
+            SLOW_QUERY_LOG_ENABLED=False,
+        )
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
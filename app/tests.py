@@ -1,3 +1,1714 @@
-from django.test import TestCase
+import csv
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localdate, localtime, now
+
+from .dashboard import dashboard_metrics
+from .forms import LeadForm
+from .funnel import lead_funnel
+from .counters import get_counters, reconcile_counters
+from .inbox import bulk_set_read_status
+from .leads import intake_lead, purge_inactive_leads, soft_delete_leads
+from .mail import enqueue_mail, send_pending_mail
+from .models import (
+    ArchivedLead,
+    ArchivedMessage,
+    ArchivedQuote,
+    Counter,
+    Lead,
+    Message,
+    MonthlyRevenue,
+    Order,
+    OutboxEmail,
+    Project,
+    Quote,
+)
+from .pagecache import CSRF_PLACEHOLDER
+from .pagination import decode_cursor, keyset_paginate
+from .logs import JsonlFileHandler, read_jsonl
+from .projects import (
+    POPULAR_STYLES_CACHE_TIMEOUT,
+    POPULAR_STYLES_LIMIT,
+    popular_window_styles,
+)
+from .querystats import QueryBudgetExceeded, sample_logger, wrap_all_connections
+from .reports import build_report, invalidate_reports
+from .routers import (
+    PRIMARY_PIN_COOKIE,
+    REPLICA_ALIAS,
+    refresh_replica,
+    replica_marker_path,
+    replica_reads,
+)
+from .snapshots import find_snapshot, get_report, latest_snapshots
+from .sqlite import DEFAULT_SQLITE_PRAGMAS, pragma_statements, sqlite_pragmas
+from .search import rebuild_search_index, search, search_filter
+from .slowqueries import (
+    SlowQueryLogger,
+    entry_logger,
+    fingerprint,
+    index_scans,
+    normalize_sql,
+    table_scans,
+)
+from .rollups import rebuild_revenue_rollups, revenue_series, sales_chart
+
+
+class DashboardMetricsTests(TestCase):
+    def setUp(self):
+        today = now().date()
+        Lead.objects.create(name="Alice", email="alice@example.com", status="new")
+        Lead.objects.create(name="Bob", email="bob@example.com", status="contacted")
+        Order.objects.create(date=today, amount=Decimal("100.00"), status="pending")
+        Order.objects.create(date=today, amount=Decimal("50.00"), status="completed")
+        Order.objects.create(
+            date=date(today.year - 1, today.month, 1),
+            amount=Decimal("999.00"),
+            status="in-progress",
+        )
+        Project.objects.create(window_style="Bay", status="completed")
+        Message.objects.create(sender="a", receiver="b", subject="Hi", content="x")
+
+    def test_metrics_values(self):
+        metrics = dashboard_metrics()
+        self.assertEqual(metrics["new_leads_count"], 1)
+        self.assertEqual(metrics["pending_orders_count"], 1)
+        self.assertEqual(metrics["orders_in_progress"], 1)
+        self.assertEqual(metrics["sales_completed"], 1)
+        self.assertEqual(metrics["completed_projects_count"], 1)
+        self.assertEqual(metrics["monthly_revenue"], Decimal("150.00"))
+        self.assertEqual(metrics["total_quotes"], 0)
+        self.assertEqual(metrics["message_count"], 1)
+
+    def test_metrics_query_count(self):
+        # Counters, Order, Project, Quote and the revenue rollup.
+        with self.assertNumQueries(5):
+            dashboard_metrics()
+
+    def test_dashboard_view_uses_metrics(self):
+        user = User.objects.create_user("staff", "staff@example.com", "pass")
+        self.client.force_login(user)
+        response = self.client.get(reverse("useradmin"))
+        self.assertEqual(response.status_code, 200)
+        # Converted leads over all leads, not completed orders over leads
+        self.assertEqual(
+            response.context["metrics"], {**dashboard_metrics(), "conversion_rate": 0}
+        )
+
+
+class RevenueRollupTests(TestCase):
+    def rollup(self, year, month, status):
+        return MonthlyRevenue.objects.get(year=year, month=month, status=status)
+
+    def test_save_and_delete_keep_rollup_current(self):
+        order = Order.objects.create(
+            date=date(2024, 3, 5), amount=Decimal("10.00"), status="pending"
+        )
+        Order.objects.create(
+            date=date(2023, 3, 5), amount=Decimal("7.00"), status="pending"
+        )
+        self.assertEqual(self.rollup(2024, 3, "pending").total, Decimal("10.00"))
+        self.assertEqual(self.rollup(2023, 3, "pending").total, Decimal("7.00"))
+
+        order.status = "completed"
+        order.amount = Decimal("12.50")
+        order.save()
+        self.assertEqual(self.rollup(2024, 3, "pending").order_count, 0)
+        self.assertEqual(self.rollup(2024, 3, "completed").total, Decimal("12.50"))
+
+        order.delete()
+        self.assertEqual(self.rollup(2024, 3, "completed").total, Decimal("0.00"))
+        self.assertEqual(self.rollup(2024, 3, "completed").order_count, 0)
+
+    def test_rebuild_matches_orders(self):
+        Order.objects.create(
+            date=date(2024, 1, 1), amount=Decimal("5.00"), status="completed"
+        )
+        Order.objects.filter(status="completed").update(amount=Decimal("8.00"))
+        rebuild_revenue_rollups()
+        self.assertEqual(self.rollup(2024, 1, "completed").total, Decimal("8.00"))
+
+    def test_sales_chart_reads_trailing_months(self):
+        today = now().date()
+        Order.objects.create(date=today, amount=Decimal("20.00"), status="pending")
+        labels, data = sales_chart()
+        self.assertEqual(len(labels), 12)
+        self.assertEqual(labels[-1], f"{today.year}-{today.month:02d}")
+        self.assertEqual(data[-1], 20.0)
+
+
+class RevenueSeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for day, amount in ((date(2023, 1, 2), "10.00"), (date(2023, 2, 20), "5.00")):
+            Order.objects.create(date=day, amount=Decimal(amount), status="completed")
+        Order.objects.create(
+            date=date(2024, 5, 1), amount=Decimal("2.50"), status="pending"
+        )
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+
+    def test_buckets(self):
+        start, end = date(2023, 1, 1), date(2024, 12, 31)
+        quarters = revenue_series(start, end, "quarter")
+        self.assertEqual([row["period"] for row in quarters], ["2023-Q1", "2024-Q2"])
+        self.assertEqual(quarters[0]["total"], Decimal("15.00"))
+        self.assertEqual(quarters[0]["orders"], 2)
+        self.assertEqual(len(revenue_series(start, end, "day")), 3)
+        self.assertEqual(len(revenue_series(start, end, "month", "pending")), 1)
+
+    def test_cached_until_orders_change(self):
+        start, end = date(2023, 1, 1), date(2023, 12, 31)
+        revenue_series(start, end)
+        with self.assertNumQueries(0):
+            revenue_series(start, end)
+        Order.objects.create(
+            date=date(2023, 3, 1), amount=Decimal("1.00"), status="pending"
+        )
+        self.assertEqual(len(revenue_series(start, end)), 3)
+
+    def test_json_endpoint(self):
+        response = self.client.get(
+            reverse("revenue_data"),
+            {"start": "2023-01-01", "end": "2023-12-31", "bucket": "month"},
+        )
+        self.assertEqual(response.status_code, 200)
+        series = response.json()["series"]
+        self.assertEqual([row["period"] for row in series], ["2023-01", "2023-02"])
+
+    def test_json_endpoint_rejects_bad_params(self):
+        response = self.client.get(reverse("revenue_data"), {"bucket": "year"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("revenue_data"), {"start": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_revenue_page(self):
+        response = self.client.get(reverse("revenue"), {"bucket": "quarter"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["bucket"], "quarter")
+
+
+class LeadKeysetPaginationTests(TestCase):
+    def setUp(self):
+        start = now()
+        for i in range(7):
+            Lead.objects.create(name=f"Lead {i}", email=f"lead{i}@example.com")
+        # Two leads share a timestamp so the id tie-breaker is exercised.
+        Lead.objects.update(created_at=start)
+        for i, lead in enumerate(Lead.objects.order_by("id")[:5]):
+            Lead.objects.filter(pk=lead.pk).update(
+                created_at=start - timedelta(minutes=i)
+            )
+        self.ordered = list(Lead.objects.order_by("-created_at", "-id"))
+
+    def test_walks_forward_and_back(self):
+        first = keyset_paginate(Lead.objects.all(), 3)
+        self.assertEqual(list(first), self.ordered[:3])
+        self.assertFalse(first.has_previous)
+
+        second = keyset_paginate(Lead.objects.all(), 3, after=first.next_cursor)
+        self.assertEqual(list(second), self.ordered[3:6])
+
+        third = keyset_paginate(Lead.objects.all(), 3, after=second.next_cursor)
+        self.assertEqual(list(third), self.ordered[6:])
+        self.assertFalse(third.has_next)
+
+        back = keyset_paginate(Lead.objects.all(), 3, before=third.previous_cursor)
+        self.assertEqual(list(back), self.ordered[3:6])
+        self.assertTrue(back.has_previous)
+
+    def test_deep_page_seeks_index(self):
+        page = keyset_paginate(Lead.objects.all(), 3)
+        created_at, pk = decode_cursor(page.next_cursor)
+        queryset = (
+            Lead.objects.filter(created_at__lte=created_at)
+            .filter(Q(created_at__lt=created_at) | Q(id__lt=pk))
+            .order_by("-created_at", "-id")[:4]
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("lead_created_at_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    @override_settings(LEADS_PAGE_SIZE=4)
+    def test_admin_leads_view_uses_page_size(self):
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+        response = self.client.get(reverse("adminleads"))
+        self.assertEqual(len(response.context["leads"]), 4)
+        response = self.client.get(reverse("adminleads"), {"after": "garbage"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["leads"]), self.ordered[:4])
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        amounts = ["5.00", "20.00", "5.00", "12.00", "8.00"]
+        for day, amount in enumerate(amounts, start=1):
+            Order.objects.create(
+                date=date(2024, 5, day), amount=Decimal(amount), status="pending"
+            )
+        Order.objects.create(
+            date=date(2024, 5, 3), amount=Decimal("99.00"), status="completed"
+        )
+        self.pending = Order.objects.filter(status="pending")
+
+    def test_walks_amount_order_with_ties(self):
+        ordered = list(self.pending.order_by("amount", "id"))
+        first = keyset_paginate(self.pending, 2, ordering="amount")
+        self.assertEqual(list(first), ordered[:2])
+        second = keyset_paginate(
+            self.pending, 2, after=first.next_cursor, ordering="amount"
+        )
+        self.assertEqual(list(second), ordered[2:4])
+        back = keyset_paginate(
+            self.pending, 2, before=second.previous_cursor, ordering="amount"
+        )
+        self.assertEqual(list(back), ordered[:2])
+
+    @override_settings(ORDERS_PAGE_SIZE=2)
+    def test_pending_orders_view_filters_and_paginates(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("pending_orders"),
+            {"start": "2024-05-02", "end": "2024-05-04", "sort": "-amount"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [order.amount for order in response.context["orders"]],
+            [Decimal("20.00"), Decimal("12.00")],
+        )
+        self.assertEqual(response.context["pending_orders_count"], 3)
+        response = self.client.get(
+            reverse("pending_orders"),
+            {
+                "start": "2024-05-02",
+                "end": "2024-05-04",
+                "sort": "-amount",
+                "after": response.context["page_obj"].next_cursor,
+            },
+        )
+        self.assertEqual(
+            [order.amount for order in response.context["orders"]],
+            [Decimal("5.00")],
+        )
+
+    @override_settings(ORDERS_PAGE_SIZE=2)
+    def test_orders_view_page_links_keep_pending_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("orders"), {"view": "pending"})
+        query = response.context["filter_query"]
+        self.assertIn("view=pending", query)
+        response = self.client.get(
+            f"{reverse('orders')}?{query}"
+            f"&after={response.context['page_obj'].next_cursor}"
+        )
+        self.assertEqual(response.context["view_mode"], "pending")
+        self.assertEqual(
+            {order.status for order in response.context["orders"]}, {"pending"}
+        )
+
+    def test_orders_view_rejects_bad_filters(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("orders"), {"sort": "customer"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["filters"]["sort"], "-date")
+        self.assertEqual(response.context["orders_count"], 6)
+
+    def test_status_filter_seeks_index(self):
+        queryset = (
+            Order.objects.filter(status="pending", date__lte=date(2024, 5, 3))
+            .filter(Q(date__lt=date(2024, 5, 3)) | Q(id__lt=3))
+            .order_by("-date", "-id")[:3]
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("order_status_date_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class ReportsExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        Order.objects.create(
+            date=date(2024, 5, 1), amount=Decimal("10.00"), status="pending"
+        )
+        Order.objects.create(
+            date=date(2024, 6, 1), amount=Decimal("25.00"), status="completed"
+        )
+        lead = Lead.objects.create(name="Ann", email="ann@example.com")
+        Lead.objects.filter(pk=lead.pk).update(
+            created_at=datetime(2024, 5, 31, 23, 30, tzinfo=timezone.utc)
+        )
+        Quote.objects.create(name="Bob", email="bob@example.com", details="Roof")
+
+    def export(self, **params):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("reports_export"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.reader(StringIO(content)))
+
+    def test_streams_every_section(self):
+        rows = self.export()
+        self.assertEqual(rows[0], ["Orders"])
+        self.assertEqual(rows[1], ["Id", "Date", "Status", "Amount"])
+        self.assertEqual([row[3] for row in rows[2:4]], ["10.00", "25.00"])
+        self.assertIn(["Leads"], rows)
+        self.assertIn(["Quotes"], rows)
+        self.assertEqual(rows[-1][2:], ["Bob", "bob@example.com", "", "Roof"])
+
+    def test_filters_by_range_and_type(self):
+        rows = self.export(start_date="2024-05-01", end_date="2024-05-31")
+        orders = rows[2:rows.index([])]
+        self.assertEqual([row[1] for row in orders], ["2024-05-01"])
+        self.assertEqual(rows[rows.index(["Leads"]) + 2][2], "Ann")
+        self.assertEqual(
+            rows[-1], ["Id", "Created At", "Name", "Email", "Phone", "Details"]
+        )
+
+        rows = self.export(type="leads", end_date="2024-05-30")
+        self.assertEqual(rows, [["Leads"], rows[1]])
+
+    def test_rejects_bad_parameters(self):
+        self.client.force_login(self.user)
+        url = reverse("reports_export")
+        self.assertEqual(self.client.get(url, {"start_date": "May"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"type": "users"}).status_code, 400)
+
+
+class ReportsEngineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        for day, amount, status in (
+            (date(2024, 5, 2), "10.00", "pending"),
+            (date(2024, 5, 9), "30.00", "completed"),
+            (date(2024, 6, 1), "25.00", "pending"),
+        ):
+            Order.objects.create(date=day, amount=Decimal(amount), status=status)
+        lead = Lead.objects.create(name="Ann", email="ann@example.com")
+        Lead.objects.filter(pk=lead.pk).update(
+            created_at=datetime(2024, 5, 9, 12, tzinfo=timezone.utc)
+        )
+
+    def test_aggregates_range_in_two_queries_then_caches(self):
+        with self.assertNumQueries(2):
+            report = build_report(date(2024, 5, 1), date(2024, 5, 31))
+        self.assertEqual(report["total_revenue"], Decimal("40.00"))
+        self.assertEqual(report["total_orders"], 2)
+        self.assertEqual(report["pending_orders"], 1)
+        self.assertEqual(report["total_customers"], 1)
+        self.assertEqual(
+            [row["title"] for row in report["report_data"]],
+            ["2024-05-02", "2024-05-09"],
+        )
+        self.assertEqual(report["report_data"][1]["leads"], 1)
+        with self.assertNumQueries(0):
+            build_report(date(2024, 5, 1), date(2024, 5, 31))
+
+        report = build_report()
+        self.assertEqual(report["total_orders"], 3)
+        self.assertEqual(
+            [row["title"] for row in report["report_data"]], ["May 2024", "June 2024"]
+        )
+
+    def test_order_change_invalidates_only_covering_ranges(self):
+        build_report(date(2024, 5, 1), date(2024, 5, 31))
+        build_report(date(2024, 6, 1), date(2024, 6, 30))
+        Order.objects.create(
+            date=date(2024, 5, 20), amount=Decimal("5.00"), status="pending"
+        )
+        with self.assertNumQueries(0):
+            build_report(date(2024, 6, 1), date(2024, 6, 30))
+        report = build_report(date(2024, 5, 1), date(2024, 5, 31))
+        self.assertEqual(report["pending_orders"], 2)
+
+    def test_open_ranges_and_full_invalidation(self):
+        build_report()
+        build_report(date(2024, 6, 1), date(2024, 6, 30))
+        Order.objects.create(
+            date=date(2024, 5, 20), amount=Decimal("5.00"), status="pending"
+        )
+        self.assertEqual(build_report()["total_orders"], 4)
+        invalidate_reports()
+        with self.assertNumQueries(2):
+            build_report(date(2024, 6, 1), date(2024, 6, 30))
+
+    def test_reports_view_renders_range(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("reports"), {"start_date": "2024-06-01", "end_date": "2024-06-30"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_revenue"], Decimal("25.00"))
+        self.assertContains(response, "1 orders (1 pending)")
+        response = self.client.get(reverse("reports"), {"start_date": "June"})
+        self.assertEqual(response.context["total_orders"], 3)
+
+
+class ReportSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        override = override_settings(REPORTS_SNAPSHOT_DIR=self.directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        Order.objects.create(
+            date=date(2024, 5, 9), amount=Decimal("30.00"), status="completed"
+        )
+        Order.objects.create(
+            date=date(2024, 6, 2), amount=Decimal("12.00"), status="pending"
+        )
+
+    def test_builds_every_period_and_serves_from_disk(self):
+        call_command("build_reports", "--date", "2024-06-03", stdout=StringIO())
+        self.assertEqual(
+            latest_snapshots(),
+            [
+                ("daily", date(2024, 6, 2), date(2024, 6, 2)),
+                ("weekly", date(2024, 5, 27), date(2024, 6, 2)),
+                ("monthly", date(2024, 5, 1), date(2024, 5, 31)),
+            ],
+        )
+        with self.assertNumQueries(0):
+            report = get_report(date(2024, 5, 1), date(2024, 5, 31))
+        self.assertEqual(report["total_revenue"], Decimal("30.00"))
+        self.assertEqual(report["orders_by_status"], {"completed": 1})
+        self.assertEqual(report["report_data"][0]["created_at"].day, 9)
+
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+        params = {"start_date": "2024-06-02", "end_date": "2024-06-02"}
+        response = self.client.get(reverse("reports"), params)
+        self.assertEqual(response.context["pending_orders"], 1)
+        response = self.client.get(reverse("reports_export"), params)
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("12.00", content)
+        self.assertNotIn("30.00", content)
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        # A snapshot pruned between the lookup and the open is exported live
+        missing = os.path.join(self.directory.name, "pruned.csv")
+        with patch("LPageToAdmin.views.find_snapshot", return_value=missing):
+            response = self.client.get(reverse("reports_export"), params)
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("12.00", content)
+        self.assertNotIn("30.00", content)
+
+    def test_changes_make_covering_snapshots_stale(self):
+        call_command("build_reports", "--date", "2024-06-03", stdout=StringIO())
+        monthly = os.path.join(self.directory.name, "monthly")
+        with patch("app.snapshots.os.remove") as remove:
+            Order.objects.create(
+                date=date(2024, 5, 20), amount=Decimal("5.00"), status="pending"
+            )
+        remove.assert_not_called()
+        self.assertIsNone(find_snapshot(date(2024, 5, 1), date(2024, 5, 31)))
+        self.assertTrue(find_snapshot(date(2024, 6, 2), date(2024, 6, 2)))
+        report = get_report(date(2024, 5, 1), date(2024, 5, 31))
+        self.assertEqual(report["total_revenue"], Decimal("35.00"))
+
+        # The next build deletes the stale files
+        self.assertEqual(len(os.listdir(monthly)), 2)
+        call_command("build_reports", "--date", "2024-05-02", stdout=StringIO())
+        self.assertEqual(
+            sorted(os.listdir(monthly)),
+            ["2024-04-01_2024-04-30.csv", "2024-04-01_2024-04-30.json"],
+        )
+        cache.clear()
+        self.assertIsNone(find_snapshot(date(2024, 4, 1), date(2024, 4, 30)))
+
+    def test_reports_page_defaults_to_newest_snapshot(self):
+        call_command("build_reports", "--date", "2024-06-03", stdout=StringIO())
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+        response = self.client.get(reverse("reports"))
+        # The daily and weekly snapshots both end on June 2; the longer wins
+        self.assertEqual(response.context["period"], "weekly")
+        self.assertEqual(response.context["start"], date(2024, 5, 27))
+        self.assertEqual(response.context["total_orders"], 1)
+        response = self.client.get(reverse("reports"), {"all": "1"})
+        self.assertEqual(response.context["total_orders"], 2)
+
+    def test_prunes_old_snapshots(self):
+        for day in ("2024-06-01", "2024-06-02", "2024-06-03"):
+            call_command(
+                "build_reports",
+                "--period",
+                "daily",
+                "--date",
+                day,
+                "--keep",
+                "2",
+                stdout=StringIO(),
+            )
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.directory.name, "daily"))),
+            [
+                "2024-06-01_2024-06-01.csv",
+                "2024-06-01_2024-06-01.json",
+                "2024-06-02_2024-06-02.csv",
+                "2024-06-02_2024-06-02.json",
+            ],
+        )
+
+
+class LeadFunnelTests(TestCase):
+    def lead(self, email, service, status, created_at):
+        lead = Lead.objects.create(
+            name="Lead", email=email, service=service, status=status
+        )
+        Lead.objects.filter(pk=lead.pk).update(created_at=created_at)
+
+    def setUp(self):
+        # Wednesday 2024-05-15; its cohort week starts Monday 2024-05-13
+        this_week = datetime(2024, 5, 14, 9, tzinfo=timezone.utc)
+        last_week = this_week - timedelta(weeks=1)
+        self.lead("a@example.com", "roof_repair", "converted", this_week)
+        self.lead("b@example.com", "roof_repair", "new", this_week)
+        self.lead("c@example.com", "roof_repair", "contacted", last_week)
+        self.lead("d@example.com", "door_installation", "converted", last_week)
+        self.lead(
+            "e@example.com", "door_installation", "new", last_week - timedelta(weeks=60)
+        )
+
+    def test_one_query_for_every_cohort(self):
+        with self.assertNumQueries(1):
+            funnel = lead_funnel(today=date(2024, 5, 15))
+        self.assertEqual(len(funnel["cohorts"]), 52)
+        self.assertEqual(funnel["totals"]["leads"], 4)
+        self.assertEqual(funnel["totals"]["contacted"], 3)
+        self.assertEqual(funnel["totals"]["converted"], 2)
+        self.assertEqual(funnel["totals"]["rates"]["converted"], 50.0)
+
+        roof = funnel["services"]["roof_repair"]
+        self.assertEqual(
+            (roof["label"], roof["leads"], roof["converted"]), ("Roof Repair", 3, 1)
+        )
+        self.assertEqual(funnel["services"]["window_replacement"]["leads"], 0)
+
+        current, previous = funnel["cohorts"][-1], funnel["cohorts"][-2]
+        self.assertEqual(current["week"], date(2024, 5, 13))
+        self.assertEqual((current["leads"], current["converted"]), (2, 1))
+        self.assertEqual(previous["services"]["door_installation"]["converted"], 1)
+        self.assertEqual(previous["rates"]["contacted"], 100.0)
+
+    def test_leads_are_grouped_in_the_database(self):
+        for i in range(3):
+            self.lead(
+                f"x{i}@example.com",
+                "roof_repair",
+                "new",
+                datetime(2024, 5, 14, 10 + i, tzinfo=timezone.utc),
+            )
+        with CaptureQueriesContext(connection) as queries:
+            funnel = lead_funnel(today=date(2024, 5, 15))
+        self.assertIn("GROUP BY", queries[0]["sql"])
+        self.assertEqual(funnel["cohorts"][-1]["services"]["roof_repair"]["leads"], 5)
+
+
+class ProjectListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for style, status in (
+            ("Bay", "completed"),
+            ("Bay", "in-progress"),
+            ("Casement", "completed"),
+            ("Bay", "completed"),
+            ("Sliding", "in-progress"),
+        ):
+            Project.objects.create(window_style=style, status=status)
+
+    def test_popular_styles_expire(self):
+        with patch("app.projects.cache.set") as cache_set:
+            popular_window_styles()
+        self.assertEqual(cache_set.call_args.args[2], POPULAR_STYLES_CACHE_TIMEOUT)
+
+    def test_popular_styles_cached_until_projects_change(self):
+        styles = popular_window_styles()
+        self.assertEqual(styles[0], {"window_style": "Bay", "style_count": 3})
+        with self.assertNumQueries(0):
+            popular_window_styles()
+        Project.objects.create(window_style="Sliding", status="completed")
+        Project.objects.filter(window_style="Bay").first().delete()
+        self.assertEqual(
+            popular_window_styles(2),
+            [
+                {"window_style": "Bay", "style_count": 2},
+                {"window_style": "Sliding", "style_count": 2},
+            ],
+        )
+
+    def test_popular_styles_beyond_cached_limit(self):
+        for style in ("Awning", "Hopper", "Picture", "Skylight"):
+            Project.objects.create(window_style=style, status="completed")
+        popular_window_styles()
+        with self.assertNumQueries(1):
+            styles = popular_window_styles(POPULAR_STYLES_LIMIT + 2)
+        self.assertEqual(len(styles), 7)
+
+    @override_settings(PROJECTS_PAGE_SIZE=2)
+    def test_projects_view_filters_and_paginates(self):
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+        completed = list(
+            Project.objects.filter(status="completed").order_by("-id")
+        )
+        response = self.client.get(reverse("projects"), {"status": "completed"})
+        self.assertEqual(list(response.context["projects"]), completed[:2])
+        response = self.client.get(
+            reverse("projects"),
+            {"status": "completed", "after": response.context["page_obj"].next_cursor},
+        )
+        self.assertEqual(list(response.context["projects"]), completed[2:])
+        self.assertFalse(response.context["page_obj"].has_next)
+
+        response = self.client.get(reverse("projects"), {"status": "bogus"})
+        self.assertIsNone(response.context["status"])
+        self.assertEqual(len(response.context["projects"]), 2)
+
+
+class HotQueryIndexTests(TestCase):
+    """Every hot filter and ordering is answered from an index."""
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return " ".join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertUsesIndex(self, queryset, index):
+        plan = self.query_plan(queryset)
+        self.assertIn(index, plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_lead_default_ordering_is_newest_first(self):
+        self.assertEqual(Lead._meta.ordering, ["-created_at"])
+        self.assertEqual(str(Lead._meta.verbose_name_plural), "Leads")
+        self.assertUsesIndex(Lead.objects.all()[:20], "lead_created_at_id_idx")
+
+    def test_lead_status_filter(self):
+        self.assertUsesIndex(
+            Lead.objects.filter(status="new").order_by().values("pk"),
+            "lead_status_created_at_idx",
+        )
+        self.assertUsesIndex(
+            Lead.objects.filter(status="new")[:20], "lead_status_created_at_idx"
+        )
+
+    def test_lead_email_lookup(self):
+        self.assertUsesIndex(
+            Lead.objects.annotate(email_key=Lower("email"))
+            .filter(email_key="ann@example.com")
+            .order_by(),
+            "unique_lead_email_ci",
+        )
+
+    def test_lead_created_at_range(self):
+        self.assertUsesIndex(
+            Lead.objects.filter(created_at__gte=now()).order_by("created_at", "id"),
+            "lead_created_at_id_idx",
+        )
+
+    def test_order_status_and_date(self):
+        self.assertUsesIndex(
+            Order.objects.filter(status="pending").order_by("-date", "-id"),
+            "order_status_date_idx",
+        )
+        self.assertUsesIndex(
+            Order.objects.filter(date__gte=date(2024, 1, 1)).order_by("date", "id"),
+            "order_date_id_idx",
+        )
+
+    def test_message_unread_and_inbox(self):
+        self.assertUsesIndex(
+            # The shape of the unread counter's COUNT(*)
+            Message.objects.filter(is_read=False).order_by().values("pk"),
+            "message_is_read_created_idx",
+        )
+        self.assertUsesIndex(Message.objects.all()[:50], "message_created_at_id_idx")
+
+    def test_quote_created_at_range(self):
+        self.assertUsesIndex(
+            Quote.objects.filter(created_at__gte=now()).order_by("created_at", "id"),
+            "quote_created_at_id_idx",
+        )
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser("staff", "staff@example.com", "pass")
+        self.client.force_login(self.user)
+        # Several rows of each kind, so a per-row query would exceed the budget
+        for i in range(10):
+            Lead.objects.create(name=f"Lead {i}", email=f"lead{i}@example.com")
+            Message.objects.create(
+                sender="Ann", receiver="Bob", subject=f"Hi {i}", content="Hello"
+            )
+            Quote.objects.create(name=f"Quote {i}", email=f"q{i}@example.com")
+            Order.objects.create(
+                date=date(2024, 1, i + 1), amount=Decimal("10.00"), status="pending"
+            )
+            Project.objects.create(window_style="Bay", status="completed")
+
+    @override_settings(QUERY_BUDGET_ACTION="raise", QUERY_STATS_ENABLED=False)
+    def test_views_stay_within_budget(self):
+        for name in settings.QUERY_BUDGETS:
+            with self.subTest(view=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(
+        QUERY_BUDGETS={"home": 0},
+        QUERY_BUDGET_ACTION="log",
+        QUERY_STATS_ENABLED=False,
+    )
+    def test_over_budget_logs_a_warning(self):
+        with self.assertLogs("app.querystats", "WARNING") as logs:
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("home ran", logs.output[0])
+
+    @override_settings(
+        QUERY_BUDGETS={"home": 0},
+        QUERY_BUDGET_ACTION="raise",
+        QUERY_STATS_ENABLED=False,
+    )
+    def test_over_budget_raises_when_configured(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse("home"))
+
+    @override_settings(QUERY_STATS_ENABLED=True)
+    def test_samples_are_recorded_and_summarized(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "query_stats.jsonl")
+            handler = JsonlFileHandler(path)
+            with patch.object(sample_logger, "handlers", [handler]):
+                self.client.get(reverse("adminleads"))
+                self.client.get(reverse("adminleads"))
+                self.client.get(reverse("home"))
+            handler.close()
+
+            samples = list(read_jsonl(path))
+            self.assertEqual(
+                [sample["view"] for sample in samples],
+                ["adminleads", "adminleads", "home"],
+            )
+            self.assertGreater(samples[0]["queries"], 0)
+            self.assertTrue(samples[0]["slowest_sql"])
+            self.assertEqual(samples[0]["budget"], settings.QUERY_BUDGETS["adminleads"])
+
+            out = StringIO()
+            call_command("querystats", file=path, show_sql=True, stdout=out)
+        report = out.getvalue()
+        self.assertIn("adminleads", report)
+        self.assertIn("SELECT", report)
+
+
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "slow_queries.jsonl")
+        handler = JsonlFileHandler(self.path)
+        self.addCleanup(handler.close)
+        patcher = patch.object(entry_logger, "handlers", [handler])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT *  FROM app_lead\nWHERE id IN (%s, %s, %s) "
+                "AND name = 'it''s' LIMIT 21"
+            ),
+            "SELECT * FROM app_lead WHERE id IN (?) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            fingerprint("SELECT 1 FROM app_lead WHERE id IN (%s)"),
+            fingerprint("SELECT 1 FROM app_lead WHERE id IN (%s, %s)"),
+        )
+
+    @override_settings(SLOW_QUERY_LOG_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_request_statements_are_logged_with_plan(self):
+        Lead.objects.create(name="Ann", email="ann@example.com")
+        user = User.objects.create_superuser("staff", "staff@example.com", "pass")
+        self.client.force_login(user)
+        self.client.get(reverse("adminleads"))
+
+        entries = [
+            entry
+            for entry in read_jsonl(self.path)
+            if "app_lead" in entry["sql"] and entry["sql"].startswith("SELECT")
+        ]
+        self.assertTrue(entries)
+        entry = entries[0]
+        self.assertEqual(entry["view"], "adminleads")
+        self.assertEqual(entry["database"], "default")
+        self.assertIsInstance(entry["params"], list)
+        self.assertTrue(entry["plan"])
+        self.assertEqual(entry["fingerprint"], fingerprint(entry["sql"]))
+
+    def test_command_groups_by_fingerprint_and_flags_table_scans(self):
+        with wrap_all_connections(SlowQueryLogger(threshold_ms=0)):
+            # No index covers the phone filter or every row's is_active
+            list(Lead.all_objects.filter(phone="123"))
+            list(Lead.all_objects.filter(phone="456"))
+            list(Lead.objects.filter(status="new"))
+            # Walks the whole created_at index for the default ordering
+            list(Lead.objects.filter(name__icontains="a"))
+
+        out = StringIO()
+        call_command("slowqueries", file=self.path, scans_only=True, stdout=out)
+        report = out.getvalue()
+        self.assertIn("2x", report)
+        self.assertIn("Full table scan: app.Lead", report)
+        self.assertIn("Full index scan: app.Lead", report)
+        self.assertIn('"app_lead"."phone" = ?', report)
+        self.assertNotIn('"status" = ?', report)
+
+    def test_index_walks_are_index_scans_without_limit(self):
+        plan = [
+            "SCAN app_lead USING INDEX lead_created_at_id_idx",
+            "SCAN app_message USING COVERING INDEX message_created_at_id_idx",
+            "SCAN app_order USING INTEGER PRIMARY KEY (rowid>?)",
+            "SEARCH app_quote USING INDEX quote_created_at_id_idx (<expr>>?)",
+            "SCAN app_project",
+        ]
+        self.assertEqual(table_scans(plan), ["app.Project"])
+        self.assertEqual(
+            index_scans(plan, "SELECT ... ORDER BY created_at"),
+            ["app.Lead", "app.Message", "app.Order"],
+        )
+        self.assertEqual(index_scans(plan, "SELECT ... ORDER BY id LIMIT 21"), [])
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        old = now() - timedelta(days=400)
+        self.old_leads = [
+            Lead.objects.create(name="Olga Old", email="olga@example.com"),
+            Lead.objects.create(
+                name="Omar Old", email="omar@example.com", status="converted"
+            ),
+        ]
+        self.new_lead = Lead.objects.create(name="Nina New", email="nina@example.com")
+        self.old_message = Message.objects.create(
+            sender="Ann", receiver="admin", subject="Old invoice", content="Paid"
+        )
+        Message.objects.create(
+            sender="Ben", receiver="admin", subject="Fresh", content="Hello"
+        )
+        self.old_quote = Quote.objects.create(name="Otto", email="otto@example.com")
+        Quote.objects.create(name="Nora", email="nora@example.com")
+        # created_at is auto_now_add, so backdate with an UPDATE
+        Lead.objects.filter(pk__in=[lead.pk for lead in self.old_leads]).update(
+            created_at=old
+        )
+        Message.objects.filter(pk=self.old_message.pk).update(created_at=old)
+        Quote.objects.filter(pk=self.old_quote.pk).update(created_at=old)
+
+    def test_moves_old_rows_in_batches(self):
+        call_command("archive_old_rows", batch_size=1, stdout=StringIO())
+
+        self.assertEqual(list(Lead.objects.all()), [self.new_lead])
+        self.assertEqual(
+            set(ArchivedLead.objects.values_list("id", flat=True)),
+            {lead.pk for lead in self.old_leads},
+        )
+        archived = ArchivedLead.objects.get(pk=self.old_leads[1].pk)
+        self.assertEqual(archived.status, "converted")
+        self.assertEqual(archived.email, "omar@example.com")
+        self.assertEqual(Message.objects.count(), 1)
+        self.assertTrue(ArchivedMessage.objects.filter(pk=self.old_message.pk).exists())
+        self.assertEqual(Quote.objects.count(), 1)
+        self.assertTrue(ArchivedQuote.objects.filter(pk=self.old_quote.pk).exists())
+        # Archived rows leave the full-text index
+        self.assertEqual(list(search(Lead.objects.all(), "olga")), [])
+
+    def test_counters_move_to_archive_totals(self):
+        call_command("archive_old_rows", stdout=StringIO())
+        counters = get_counters()
+        self.assertEqual(counters["total_leads"], 1)
+        self.assertEqual(counters["new_leads"], 1)
+        self.assertEqual(counters["total_messages"], 1)
+        self.assertEqual(counters["unread_messages"], 1)
+        self.assertEqual(counters["archived_leads"], 2)
+        self.assertEqual(counters["archived_quotes"], 1)
+        self.assertEqual(counters["archived_messages"], 1)
+        self.assertEqual(reconcile_counters(), counters)
+        # Dashboard totals combine hot and archived rows
+        self.assertEqual(dashboard_metrics()["total_quotes"], 2)
+
+    def test_dry_run_moves_nothing(self):
+        out = StringIO()
+        call_command("archive_old_rows", dry_run=True, only=["leads"], stdout=out)
+        self.assertIn("leads: 2 rows would be archived", out.getvalue())
+        self.assertEqual(Lead.objects.count(), 3)
+        self.assertFalse(ArchivedLead.objects.exists())
+
+    def test_admin_search_reads_archive_only_on_request(self):
+        call_command("archive_old_rows", stdout=StringIO())
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("adminleads"), {"q": "olga"})
+        self.assertIsNone(response.context["archived_leads"])
+        response = self.client.get(reverse("adminleads"), {"q": "olga", "archive": 1})
+        self.assertEqual(
+            [lead.pk for lead in response.context["archived_leads"]],
+            [self.old_leads[0].pk],
+        )
+        response = self.client.get(
+            reverse("admininbox"), {"q": "invoice", "archive": 1}
+        )
+        self.assertEqual(
+            [message.pk for message in response.context["archived_messages"]],
+            [self.old_message.pk],
+        )
+        self.assertEqual(response.context["message_count"], 2)
+
+    def test_import_skips_archived_emails(self):
+        call_command("archive_old_rows", only=["leads"], stdout=StringIO())
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(handle, "w") as f:
+            f.write('{"name": "Olga", "email": "OLGA@example.com"}\n')
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+        call_command("import_leads", path, stdout=out)
+        self.assertIn("0 imported, 1 duplicates", out.getvalue())
+        # The public intake does not look the archive up
+        lead, created = intake_lead(name="Olga", email="OLGA@example.com")
+        self.assertTrue(created)
+
+    def test_reports_count_archived_leads(self):
+        start = localdate(now() - timedelta(days=400))
+        before = build_report(start, start)["total_customers"]
+        call_command("archive_old_rows", only=["leads"], stdout=StringIO())
+        cache.clear()
+        self.assertEqual(build_report(start, start)["total_customers"], before)
+        self.assertEqual(before, 2)
+
+
+class LeadSoftDeleteTests(TestCase):
+    def setUp(self):
+        self.lead = Lead.objects.create(name="Rita Roofer", email="rita@example.com")
+        self.other = Lead.objects.create(
+            name="Dan", email="dan@example.com", status="contacted"
+        )
+        self.user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+
+    def test_delete_view_soft_deletes(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("delete_lead", args=[self.lead.pk]))
+
+        self.assertEqual(list(Lead.objects.all()), [self.other])
+        self.assertFalse(Lead.all_objects.get(pk=self.lead.pk).is_active)
+        counters = get_counters()
+        self.assertEqual(counters["total_leads"], 1)
+        self.assertEqual(counters["new_leads"], 0)
+        self.assertEqual(reconcile_counters(), counters)
+        self.assertEqual(list(search(Lead.all_objects.all(), "rita")), [])
+
+    def test_email_of_deleted_lead_can_be_submitted_again(self):
+        soft_delete_leads(Lead.objects.filter(pk=self.lead.pk))
+        lead, created = intake_lead(name="Rita", email="RITA@example.com")
+        self.assertTrue(created)
+        form = LeadForm(data={"name": "Rita", "email": "rita@example.com"})
+        self.assertFalse(form.is_valid())
+
+    def test_restore_and_hard_delete_keep_counters(self):
+        soft_delete_leads(Lead.objects.filter(pk=self.lead.pk))
+        lead = Lead.all_objects.get(pk=self.lead.pk)
+        lead.is_active = True
+        lead.save()
+        self.assertEqual(get_counters()["total_leads"], 2)
+        self.assertEqual(get_counters()["new_leads"], 1)
+        self.assertEqual(list(search(Lead.objects.all(), "rita")), [lead])
+
+        soft_delete_leads(Lead.objects.filter(pk=self.lead.pk))
+        # Deleting an already soft-deleted lead does not count it twice
+        Lead.all_objects.get(pk=self.lead.pk).delete()
+        self.assertEqual(get_counters()["total_leads"], 1)
+        self.assertEqual(reconcile_counters()["total_leads"], 1)
+
+    def test_purge_removes_inactive_leads_in_batches(self):
+        extra = [
+            Lead.objects.create(name=f"Lead {i}", email=f"lead{i}@example.com")
+            for i in range(3)
+        ]
+        soft_delete_leads(Lead.objects.exclude(pk=self.other.pk))
+        self.assertEqual(purge_inactive_leads(batch_size=2), 2)
+
+        out = StringIO()
+        call_command(
+            "purge_inactive_leads", force=True, batch_size=1, sleep=0, stdout=out
+        )
+        self.assertIn("Purged 2 inactive leads", out.getvalue())
+        self.assertEqual(list(Lead.all_objects.all()), [self.other])
+        self.assertFalse(Lead.all_objects.filter(pk__in=[lead.pk for lead in extra]))
+        self.assertEqual(get_counters()["total_leads"], 1)
+
+    def test_purge_waits_for_quiet_hours(self):
+        soft_delete_leads(Lead.objects.filter(pk=self.lead.pk))
+        hour = localtime().hour
+        closed = f"{(hour + 1) % 24}-{(hour + 2) % 24 or 24}"
+        out = StringIO()
+        call_command("purge_inactive_leads", quiet_hours=closed, stdout=out)
+        self.assertIn("Outside quiet hours", out.getvalue())
+        self.assertTrue(Lead.all_objects.filter(pk=self.lead.pk).exists())
+
+    def test_purge_stops_when_quiet_hours_end(self):
+        soft_delete_leads(Lead.objects.all())
+        hours = iter([2, 9])
+        out = StringIO()
+        with patch(
+            "app.management.commands.purge_inactive_leads.localtime",
+            side_effect=lambda: datetime(2024, 5, 15, next(hours)),
+        ):
+            call_command(
+                "purge_inactive_leads",
+                quiet_hours="1-5",
+                batch_size=1,
+                sleep=0,
+                stdout=out,
+            )
+        self.assertIn("Quiet hours ended after 1 leads", out.getvalue())
+        self.assertEqual(Lead.all_objects.count(), 1)
+
+    def test_partial_indexes_serve_active_and_purge_queries(self):
+        sql, params = (
+            Lead.all_objects.filter(is_active=False)
+            .order_by("id")
+            .values("pk")[:10]
+            .query.sql_with_params()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("lead_inactive_id_idx", plan)
+        sql, params = Lead.objects.all()[:20].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("lead_created_at_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=600)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("home")
+
+    def csrf_token(self, response):
+        content = response.content.decode()
+        marker = 'name="csrfmiddlewaretoken" value="'
+        start = content.index(marker) + len(marker)
+        end = content.index('"', start)
+        return content[start:end]
+
+    def test_hit_skips_templates_and_database(self):
+        with self.assertTemplateUsed("pages/index.html"):
+            self.client.get(self.url)
+        with self.assertNumQueries(0), self.assertTemplateNotUsed("pages/index.html"):
+            response = self.client.get(self.url, {"utm_source": "ad"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Cookie", response["Vary"])
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_each_visitor_gets_a_working_csrf_token(self):
+        self.client.get(self.url)
+        visitor = Client(enforce_csrf_checks=True)
+        response = visitor.get(self.url)
+        self.assertNotIn(CSRF_PLACEHOLDER, response.content.decode())
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        response = visitor.post(
+            reverse("submit_lead"),
+            {
+                "csrfmiddlewaretoken": self.csrf_token(response),
+                "email": "visitor@example.com",
+            },
+        )
+        self.assertNotEqual(response.status_code, 403)
+
+    def test_session_requests_bypass_the_cache(self):
+        self.client.get(self.url)
+        user = User.objects.create_user("staff", "staff@example.com", "pass")
+        self.client.force_login(user)
+        with self.assertTemplateUsed("pages/index.html"):
+            response = self.client.get(self.url)
+        self.assertNotIn(CSRF_PLACEHOLDER, response.content.decode())
+
+    def test_purge_command_reaches_the_serving_process(self):
+        self.client.get(self.url)
+        # The command runs in its own process, as it does against a live site
+        location = settings.CACHES["default"]["LOCATION"]
+        subprocess.run(
+            [sys.executable, "manage.py", "purge_page_cache"],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "CACHE_LOCATION": location},
+            check=True,
+            capture_output=True,
+        )
+        with self.assertTemplateUsed("pages/index.html"):
+            self.client.get(self.url)
+
+
+class SqlitePragmaTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("temp_store"), 2)  # MEMORY
+
+    @override_settings(SQLITE_PRAGMAS={"synchronous": "full", "mmap_size": None})
+    def test_settings_override_defaults(self):
+        pragmas = sqlite_pragmas()
+        self.assertEqual(pragmas["synchronous"], "full")
+        self.assertEqual(pragmas["mmap_size"], DEFAULT_SQLITE_PRAGMAS["mmap_size"])
+        with self.assertRaises(ValueError):
+            pragma_statements({"journal_mode": "wal; DROP TABLE app_lead"})
+
+    def test_benchmark_command_runs(self):
+        out = StringIO()
+        call_command(
+            "benchmark_sqlite",
+            "--writers=1",
+            "--readers=1",
+            "--seconds=0.1",
+            stdout=out,
+        )
+        self.assertIn("tuned", out.getvalue())
+
+
+class PersistentConnectionTests(TestCase):
+    def test_connections_are_reused_with_health_checks(self):
+        self.assertGreater(connection.settings_dict["CONN_MAX_AGE"], 0)
+        self.assertTrue(connection.settings_dict["CONN_HEALTH_CHECKS"])
+
+    def test_benchmark_views_command_runs(self):
+        max_age = connection.settings_dict["CONN_MAX_AGE"]
+        out = StringIO()
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            call_command("benchmark_views", "--requests=2", stdout=out)
+        keys = [call.args[0] for call in cache_set.call_args_list]
+        self.assertFalse([key for key in keys if key.startswith("pagecache:")])
+        self.assertIn("dashboard", out.getvalue())
+        self.assertEqual(connection.settings_dict["CONN_MAX_AGE"], max_age)
+
+
+class ReplicaRouterTests(TestCase):
+    def test_routes_analytics_reads_while_fresh(self):
+        with patch("app.routers.replica_is_fresh", return_value=True):
+            self.assertEqual(Lead.objects.all().db, "default")
+            with replica_reads():
+                self.assertEqual(Lead.objects.all().db, REPLICA_ALIAS)
+                # Users and sessions stay on the primary
+                self.assertEqual(User.objects.all().db, "default")
+        with replica_reads():
+            self.assertEqual(Lead.objects.all().db, "default")
+
+    def test_write_pins_reads_to_primary(self):
+        with patch("app.routers.replica_is_fresh", return_value=True):
+            with replica_reads():
+                Lead.objects.create(name="Ann", email="ann@example.com")
+                self.assertEqual(Lead.objects.all().db, "default")
+
+    def test_client_that_wrote_is_pinned(self):
+        response = self.client.post(
+            reverse("submit_lead"),
+            {"name": "Ann", "email": "ann@example.com", "service": "roof_repair"},
+        )
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+        response = self.client.get(reverse("home"))
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_refresh_copies_primary_with_backup_api(self):
+        with tempfile.TemporaryDirectory() as directory:
+            primary = os.path.join(directory, "primary.sqlite3")
+            replica = os.path.join(directory, "replica.sqlite3")
+            source = sqlite3.connect(primary)
+            with source:
+                source.execute("CREATE TABLE t (x INTEGER)")
+                source.execute("INSERT INTO t VALUES (42)")
+            source.close()
+            refresh_replica(primary, replica)
+            copy = sqlite3.connect(replica)
+            self.assertEqual(copy.execute("SELECT x FROM t").fetchall(), [(42,)])
+            copy.close()
+            self.assertTrue(os.path.exists(replica_marker_path(replica)))
+
+            # The marker records when the copy started, not when it finished
+            with patch("app.routers.time.time", return_value=1_000_000):
+                refresh_replica(primary, replica)
+            self.assertEqual(os.path.getmtime(replica_marker_path(replica)), 1_000_000)
+
+    def test_freshness_checked_once_per_request(self):
+        with patch("app.routers.replica_is_fresh", return_value=True) as fresh:
+            with replica_reads():
+                for _ in range(3):
+                    self.assertEqual(Lead.objects.all().db, REPLICA_ALIAS)
+        self.assertEqual(fresh.call_count, 1)
+
+
+class LeadIntakeTests(TestCase):
+    def test_duplicate_reported_by_constraint(self):
+        lead, created = intake_lead(name="Alice", email="Alice@Example.com ")
+        self.assertTrue(created)
+        self.assertEqual(lead.email, "Alice@example.com")
+        lead, created = intake_lead(name="Alice", email="alice@EXAMPLE.com")
+        self.assertFalse(created)
+        self.assertIsNone(lead)
+        self.assertEqual(Lead.objects.count(), 1)
+
+    def test_new_lead_is_a_single_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            intake_lead(name="Bob", email="bob@example.com")
+        lead_queries = [
+            q["sql"] for q in queries if '"app_lead"' in q["sql"].split("(")[0]
+        ]
+        self.assertEqual(len(lead_queries), 1)
+        self.assertFalse([q for q in queries if "app_archivedlead" in q["sql"]])
+        self.assertTrue(lead_queries[0].startswith('INSERT INTO "app_lead"'))
+
+    def test_submit_lead_rejects_duplicate(self):
+        self.client.post(reverse("submit_lead"), {"name": "Al", "email": "a@x.com"})
+        self.client.post(reverse("submit_lead"), {"name": "Al", "email": "A@x.com"})
+        self.assertEqual(Lead.objects.count(), 1)
+
+    def test_lead_form_uses_constraint_message(self):
+        intake_lead(name="Alice", email="alice@example.com")
+        form = LeadForm(data={"name": "Alice", "email": "ALICE@example.com"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("This email has already been submitted.", str(form.errors))
+
+
+class ImportLeadsCommandTests(TestCase):
+    def write_file(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, "w") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_imports_csv_and_skips_duplicates_and_invalid_rows(self):
+        Lead.objects.create(name="Existing", email="old@example.com")
+        path = self.write_file(
+            ".csv",
+            "name,email,phone,service\n"
+            "Ann,ann@example.com,+123456789,roof_repair\n"
+            "Ben,OLD@example.com,,\n"
+            "C,c@example.com,,\n"
+            "Dee,dee@example.com,12ab,\n"
+            "Ann Again,Ann@Example.com,,\n"
+            "Eve,eve@example.com,,\n",
+        )
+        out, err = StringIO(), StringIO()
+        call_command("import_leads", path, batch_size=2, stdout=out, stderr=err)
+        self.assertEqual(
+            sorted(Lead.objects.values_list("email", flat=True)),
+            ["ann@example.com", "eve@example.com", "old@example.com"],
+        )
+        ann = Lead.objects.get(email="ann@example.com")
+        self.assertEqual(ann.service, "roof_repair")
+        self.assertEqual(get_counters()["total_leads"], 3)
+        eve = Lead.objects.get(email="eve@example.com")
+        self.assertEqual(list(search(Lead.objects.all(), "eve")), [eve])
+        self.assertIn("2 imported, 2 duplicates, 2 invalid", out.getvalue())
+        self.assertIn("Row 4", err.getvalue())
+
+    def test_resume_skips_committed_rows(self):
+        path = self.write_file(
+            ".jsonl",
+            '{"name": "Ann", "email": "ann@example.com"}\n'
+            '{"name": "Ben", "email": "ben@example.com"}\n',
+        )
+        with open(f"{path}.checkpoint", "w") as f:
+            f.write('{"rows": 1}')
+        call_command("import_leads", path, resume=True, stdout=StringIO())
+        self.assertEqual(
+            list(Lead.objects.values_list("email", flat=True)), ["ben@example.com"]
+        )
+        self.assertFalse(os.path.exists(f"{path}.checkpoint"))
+
+    def test_rows_that_are_not_objects_are_invalid(self):
+        path = self.write_file(
+            ".jsonl",
+            '[1, 2]\n"x"\n{"name": "Ann", "email": "ann@example.com"}\n',
+        )
+        out, err = StringIO(), StringIO()
+        call_command("import_leads", path, stdout=out, stderr=err)
+        self.assertIn("1 imported, 0 duplicates, 2 invalid", out.getvalue())
+        self.assertIn("Row 2", err.getvalue())
+
+    def test_batch_of_only_duplicates(self):
+        Lead.objects.create(name="Ann", email="ann@example.com")
+        path = self.write_file(
+            ".jsonl", '{"name": "Ann", "email": "ANN@example.com"}\n'
+        )
+        out = StringIO()
+        call_command("import_leads", path, stdout=out)
+        self.assertIn("0 imported, 1 duplicates", out.getvalue())
+
+    def test_conflicting_concurrent_insert_is_not_counted(self):
+        path = self.write_file(
+            ".jsonl",
+            '{"name": "Ann", "email": "ann@example.com"}\n'
+            '{"name": "Ben", "email": "ben@example.com"}\n',
+        )
+
+        def site_inserts_ann(keys):
+            # The public form submits the same email after the duplicate check
+            Lead.objects.create(name="Ann", email="ann@example.com")
+            return set()
+
+        out = StringIO()
+        with patch(
+            "app.management.commands.import_leads.archived_emails",
+            side_effect=site_inserts_ann,
+        ):
+            call_command("import_leads", path, stdout=out)
+        self.assertEqual(Lead.objects.count(), 2)
+        self.assertEqual(get_counters()["total_leads"], 2)
+        self.assertEqual(reconcile_counters()["total_leads"], 2)
+        self.assertIn("1 imported, 1 duplicates", out.getvalue())
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.roof = Lead.objects.create(
+            name="Rita Roofer", email="rita@example.com", service="roof_repair"
+        )
+        self.door = Lead.objects.create(
+            name="Dan", email="dan@example.com", service="door_installation"
+        )
+        self.quote = Quote.objects.create(
+            name="Quinn", email="quinn@example.com", details="Bay window estimate"
+        )
+        self.message = Message.objects.create(
+            sender="Sam", receiver="admin", subject="Invoice", content="Window bill"
+        )
+
+    def test_signals_keep_index_in_sync(self):
+        self.assertEqual(list(search(Lead.objects.all(), "roof")), [self.roof])
+        self.assertEqual(list(search(Quote.objects.all(), "bay wind")), [self.quote])
+        self.assertEqual(list(search(Message.objects.all(), "bill")), [self.message])
+
+        self.door.name = "Dan Roofwright"
+        self.door.save()
+        self.assertEqual(
+            set(search(Lead.objects.all(), "roof")), {self.roof, self.door}
+        )
+        self.roof.delete()
+        self.assertEqual(list(search(Lead.objects.all(), "rita")), [])
+
+    def test_results_are_ranked(self):
+        Lead.objects.create(
+            name="Roof Roof", email="roof@example.com", service="roof_repair"
+        )
+        results = list(search(Lead.objects.all(), "roof"))
+        self.assertEqual(results[0].email, "roof@example.com")
+
+    def test_reindex_picks_up_bulk_updates(self):
+        Lead.objects.filter(pk=self.door.pk).update(name="Bulk Updated")
+        self.assertFalse(search_filter(Lead.objects.all(), "bulk").exists())
+        rebuild_search_index(Lead)
+        self.assertEqual(list(search_filter(Lead.objects.all(), "bulk")), [self.door])
+
+    def test_punctuation_is_not_fts_syntax(self):
+        self.assertEqual(list(search(Lead.objects.all(), '"rita" (')), [self.roof])
+        self.assertFalse(search(Lead.objects.all(), '"( *').exists())
+
+    def test_admin_and_custom_pages_use_index(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(user)
+        response = self.client.get("/admin/app/lead/", {"q": "rita"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.roof])
+        response = self.client.get(reverse("adminleads"), {"q": "door"})
+        self.assertEqual(list(response.context["leads"]), [self.door])
+        response = self.client.get(reverse("admininbox"), {"q": "invoice"})
+        self.assertEqual(list(response.context["messages"]), [self.message])
+
+    def test_admin_finds_soft_deleted_leads(self):
+        self.roof.is_active = False
+        self.roof.save()
+        self.assertFalse(search_filter(Lead.all_objects.all(), "rita").exists())
+        user = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(user)
+        response = self.client.get("/admin/app/lead/", {"q": "rita"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.roof])
+        response = self.client.get(
+            "/admin/app/lead/", {"q": "r", "is_active__exact": "0"}
+        )
+        self.assertEqual(list(response.context["cl"].result_list), [self.roof])
+
+
+class CountingBackend(LocmemBackend):
+    """Local SMTP stand-in that records opens and can fail chosen recipients."""
+
+    opened = 0
+    fail_for = set()
+    on_send = None
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if CountingBackend.on_send:
+            CountingBackend.on_send()
+        for message in messages:
+            if set(message.to) & self.fail_for:
+                raise ConnectionError("550 mailbox unavailable")
+        return super().send_messages(messages)
+
+
+class MailOutboxTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.fail_for = set()
+        CountingBackend.on_send = None
+
+    def test_submit_lead_only_enqueues(self):
+        self.client.post(reverse("submit_lead"), {"name": "Al", "email": "al@x.com"})
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.recipients, ["al@x.com"])
+        self.assertEqual(queued.status, "pending")
+
+    def test_worker_sends_batch_over_one_connection(self):
+        for i in range(3):
+            enqueue_mail("Hi", "Body", None, [f"user{i}@example.com"])
+        sent, failed = send_pending_mail(connection=CountingBackend())
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboxEmail.objects.filter(status="pending").exists())
+
+    def test_failures_back_off_then_give_up(self):
+        CountingBackend.fail_for = {"bad@example.com"}
+        enqueue_mail("Hi", "Body", None, ["bad@example.com"])
+        send_pending_mail(connection=CountingBackend(), retry_base=60)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.status, "pending")
+        self.assertGreater(email.next_attempt_at, now() + timedelta(seconds=59))
+        self.assertIn("550", email.last_error)
+
+        # Not due yet, so the worker leaves it alone.
+        self.assertEqual(send_pending_mail(connection=CountingBackend()), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=now())
+        send_pending_mail(connection=CountingBackend(), max_attempts=2)
+        self.assertEqual(OutboxEmail.objects.get().status, "failed")
+
+    def test_failed_send_reopens_connection(self):
+        CountingBackend.fail_for = {"bad@example.com"}
+        enqueue_mail("Hi", "Body", None, ["bad@example.com"])
+        enqueue_mail("Hi", "Body", None, ["good@example.com"])
+        sent, failed = send_pending_mail(connection=CountingBackend())
+        self.assertEqual((sent, failed), (1, 1))
+        self.assertEqual(CountingBackend.opened, 2)
+
+    def test_claimed_mail_is_skipped_by_other_workers(self):
+        enqueue_mail("Hi", "Body", None, ["user@example.com"])
+        results = []
+        CountingBackend.on_send = lambda: results.append(
+            send_pending_mail(connection=LocmemBackend())
+        )
+        self.assertEqual(send_pending_mail(connection=CountingBackend()), (1, 0))
+        self.assertEqual(results, [(0, 0)])
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND="app.tests.CountingBackend")
+    def test_run_mail_worker_command(self):
+        enqueue_mail("Hi", "Body", None, ["user@example.com"])
+        out = StringIO()
+        call_command("run_mail_worker", once=True, stdout=out)
+        self.assertIn("1 sent, 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class CounterTests(TestCase):
+    def test_signals_and_read_status_keep_counts(self):
+        lead = Lead.objects.create(name="Ann", email="ann@example.com")
+        message = Message.objects.create(
+            sender="a", receiver="b", subject="Hi", content="x"
+        )
+        counters = get_counters()
+        self.assertEqual(counters["total_leads"], 1)
+        self.assertEqual(counters["new_leads"], 1)
+        self.assertEqual(counters["unread_messages"], 1)
+
+        lead.status = "contacted"
+        lead.save()
+        Lead.objects.get(pk=lead.pk).save()
+        message.mark_as_read()
+        message.mark_as_read()
+        counters = get_counters()
+        self.assertEqual(counters["new_leads"], 0)
+        self.assertEqual(counters["unread_messages"], 0)
+
+        message.update_read_status(False)
+        self.assertEqual(get_counters()["unread_messages"], 1)
+        Message.objects.get(pk=message.pk).delete()
+        lead.delete()
+        self.assertEqual(
+            get_counters(),
+            {
+                "total_leads": 0,
+                "new_leads": 0,
+                "total_messages": 0,
+                "unread_messages": 0,
+                "archived_leads": 0,
+                "archived_quotes": 0,
+                "archived_messages": 0,
+            },
+        )
+
+    def test_reconcile_fixes_drift(self):
+        Message.objects.create(sender="a", receiver="b", subject="Hi", content="x")
+        Message.objects.update(is_read=True)  # bypasses signals
+        self.assertEqual(get_counters()["unread_messages"], 1)
+        call_command("reconcile_counters", stdout=StringIO())
+        self.assertEqual(get_counters()["unread_messages"], 0)
+
+    def test_missing_counter_is_seeded(self):
+        Counter.objects.all().delete()
+        Lead.objects.create(name="Ann", email="ann@example.com")
+        self.assertEqual(get_counters()["total_leads"], 1)
+
+    def test_inbox_reads_counts_from_counters(self):
+        reconcile_counters()
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+        Message.objects.create(sender="a", receiver="b", subject="Hi", content="x")
+        response = self.client.get(reverse("admininbox"))
+        self.assertEqual(response.context["message_count"], 1)
+        self.assertEqual(response.context["unread_messages"], 1)
+
+
+class BulkInboxTests(TestCase):
+    def setUp(self):
+        self.spam = [
+            Message.objects.create(
+                sender="spammer", receiver="admin", subject=f"Spam {i}", content="x"
+            )
+            for i in range(3)
+        ]
+        self.keep = Message.objects.create(
+            sender="friend", receiver="admin", subject="Hello", content="y"
+        )
+        Message.objects.filter(pk=self.spam[0].pk).update(
+            created_at=now() - timedelta(days=30)
+        )
+        reconcile_counters()
+        user = User.objects.create_user(
+            "staff", "staff@example.com", "pass", is_staff=True
+        )
+        self.client.force_login(user)
+
+    def post(self, **data):
+        return self.client.post(reverse("bulk_messages"), {"format": "json", **data})
+
+    def message_statements(self, queries):
+        writes = ('UPDATE "app_message"', 'DELETE FROM "app_message"')
+        return [q["sql"] for q in queries if q["sql"].startswith(writes)]
+
+    def test_mark_read_by_filter_is_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(action="mark_read", sender="spammer")
+        self.assertEqual(response.json(), {"action": "mark_read", "affected": 3})
+        self.assertEqual(len(self.message_statements(queries)), 1)
+        self.assertEqual(get_counters()["unread_messages"], 1)
+
+        response = self.post(action="mark_unread", ids=[self.spam[1].pk])
+        self.assertEqual(response.json()["affected"], 1)
+        self.assertEqual(get_counters()["unread_messages"], 2)
+
+    def test_mark_read_rolls_back_with_counter(self):
+        with patch("app.inbox.adjust_counter", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                bulk_set_read_status(Message.objects.filter(sender="spammer"))
+        self.assertFalse(Message.objects.filter(is_read=True).exists())
+
+    def test_delete_by_sender_and_date_is_one_delete(self):
+        before = (now() - timedelta(days=1)).date().isoformat()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(action="delete", sender="spammer", before=before)
+        self.assertEqual(response.json()["affected"], 1)
+        self.assertEqual(len(self.message_statements(queries)), 1)
+        self.assertFalse(Message.objects.filter(pk=self.spam[0].pk).exists())
+        self.assertEqual(get_counters()["total_messages"], 3)
+        remaining = search(Message.objects.all(), "Spam")
+        self.assertFalse(remaining.filter(pk=self.spam[0].pk).exists())
+
+    def test_empty_selection_is_rejected(self):
+        response = self.post(action="delete")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Message.objects.count(), 4)
+
+    def test_single_read_updates_only_is_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("view_message", args=[self.keep.pk]))
+        updates = self.message_statements(queries)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "is_read"', updates[0])
+        self.assertNotIn('"subject"', updates[0].split("WHERE")[0])
@@ -10,6 +10,16 @@ from django.views.generic import TemplateView
 urlpatterns = [
     # Existing routes
     path("inbox/", views.inbox_view, name="inbox"),  # Add the inbox route
+    path(
+        "inbox/<int:message_id>/read/",
+        views.mark_message_read,
+        name="mark_message_read",
+    ),
+    path(
+        "inbox/<int:message_id>/reply/",
+        views.reply_message,
+        name="reply_message",
+    ),
     path("submit-lead/", submit_lead, name="submit_lead"),
     path("projects/", views.projects_view, name="projects"),  # Admin manage projects
     path("reports/", views.reports_view, name="reports"),  # Route for Reports page
@@ -1,10 +1,11 @@
 import logging
 
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
-from django.core.mail import send_mail
 from django.db import IntegrityError
 from django.db.models import Count, Sum
 from django.db.models.functions import ExtractMonth
@@ -25,7 +26,17 @@ from .forms import (
 )
 
 # Local app imports
+from .archive import archive_search
+from .counters import get_counters
+from .leads import intake_lead
+from .mail import enqueue_mail
 from .models import Lead, Message, Order, Project, Quote  # Ensure no duplicates
+from .pagecache import cache_public_page, render_public_page
+from .projects import projects_page
+from .reports import parse_report_range
+from .routers import read_from_replica
+from .snapshots import default_report, get_report, latest_snapshots
+from .search import search
 
 # Initialize logging
 logger = logging.getLogger(__name__)
@@ -35,7 +46,7 @@ def home(request):
     """
     Handles GET and POST requests for the landing page:
     - Saves quotes to the database
-    - Sends email confirmations
+    - Queues email confirmations for run_mail_worker
     - Displays success messages
     """
     if request.method == "POST":
@@ -50,27 +61,18 @@ def home(request):
             messages.error(request, "Please fill out all fields.")
             return render(request, "pages/index.html")
 
-        # Save to database
+        # Save to database and queue the confirmation email
         try:
-            Quote.objects.create(name=name, email=email, phone=phone, message=message)
-        except Exception as e:
-            messages.error(request, "Failed to save your data. Please try again later.")
-            print(f"Database error: {e}")
-            return render(request, "pages/index.html")
-
-        # Send email
-        try:
-            send_mail(
+            Quote.objects.create(name=name, email=email, phone=phone, details=message)
+            enqueue_mail(
                 subject="Quote Request Received",
                 message=f"Thank you, {name}, for reaching out to us!",
                 from_email="your-email@example.com",  # Replace with your email
                 recipient_list=[email],
             )
         except Exception as e:
-            messages.error(
-                request, "Failed to send confirmation email. Please try again later."
-            )
-            print(f"Email error: {e}")
+            messages.error(request, "Failed to save your data. Please try again later.")
+            print(f"Database error: {e}")
             return render(request, "pages/index.html")
 
         # Redirect back to the landing page with a success message
@@ -89,7 +91,27 @@ def inbox_view(request):
     messages = Message.objects.all().order_by(
         "-created_at"
     )  # Fetch all messages, sorted by creation date
-    return render(request, "adminPages/admininbox.html", {"messages": messages})
+    query = request.GET.get("q", "").strip()
+    search_archive = bool(query and request.GET.get("archive"))
+    if query:
+        messages = search(messages, query)  # Ranked full-text matches
+    counters = get_counters()
+    return render(
+        request,
+        "adminPages/admininbox.html",
+        {
+            "messages": messages,
+            "archived_messages": (
+                archive_search("messages", query) if search_archive else None
+            ),
+            # Totals include archived rows
+            "message_count": counters["total_messages"]
+            + counters["archived_messages"],
+            "lead_count": counters["total_leads"] + counters["archived_leads"],
+            "search_query": query,
+            "search_archive": search_archive,
+        },
+    )
 
 
 @csrf_protect
@@ -101,17 +123,43 @@ def view_order(request, order_id):
 
 @csrf_protect
 def projects_view(request):
-    """Handles rendering the Projects page."""
-    projects = Project.objects.all()
-    return render(request, "adminPages/adminprojects.html", {"projects": projects})
+    """Handles rendering one page of projects, optionally filtered by status."""
+    status = request.GET.get("status")
+    if status not in dict(Project._meta.get_field("status").choices):
+        status = None
+    projects = projects_page(
+        settings.PROJECTS_PAGE_SIZE,
+        status,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+    context = {
+        "projects": projects,
+        "page_obj": projects,
+        "status": status,
+        "statuses": Project._meta.get_field("status").choices,
+    }
+    return render(request, "adminPages/adminprojects.html", context)
 
 
+@staff_member_required
+@read_from_replica
 @csrf_protect
 def reports_view(request):
-    """Handles rendering the Reports page."""
-    context = {
-        "report_data": [],
-    }
+    """Handles rendering the Reports page for the requested date range."""
+    try:
+        start, end = parse_report_range(request.GET)
+    except ValueError as e:
+        messages.error(request, str(e))
+        start, end = None, None
+    if start is None and end is None and not request.GET.get("all"):
+        # The newest snapshot rather than the all-time report
+        context = default_report()
+    else:
+        context = get_report(start, end)
+    context.setdefault("start", start)
+    context.setdefault("end", end)
+    context["snapshots"] = latest_snapshots()
     return render(request, "adminPages/adminreports.html", context)
 
 
@@ -126,16 +174,17 @@ def add_message(request):
         return redirect("inbox")
 
 
+@staff_member_required
 @csrf_protect
 def mark_message_read(request, message_id):
     if request.method == "POST":
         message = get_object_or_404(Message, id=message_id)
-        message.is_read = True
-        message.save()
+        message.mark_as_read()  # Updates only the is_read column
         messages.success(request, "Message marked as read.")
         return redirect("inbox")
 
 
+@staff_member_required
 @csrf_protect
 def reply_message(request, message_id):
     """Handles replying to a specific message."""
@@ -178,28 +227,33 @@ def login_view(request):
 
 # Template-based views
 # About Us View
+@cache_public_page
 def about_page(request):
-    return render(request, "pages/about.html")
+    return render_public_page(request, "pages/about.html")
 
 
+@cache_public_page
 def services_page(request):
-    return render(request, "pages/services.html")
+    return render_public_page(request, "pages/services.html")
 
 
+@cache_public_page
 def contact_page(request):
-    return render(request, "pages/contact.html")
+    return render_public_page(request, "pages/contact.html")
 
 
 # Terms of Use View
+@cache_public_page
 def terms_of_use_page(request):
     """Render the Terms of Use page."""
-    return render(request, "pages/terms_of_use.html")
+    return render_public_page(request, "pages/terms_of_use.html")
 
 
 # Privacy Policy View
+@cache_public_page
 def privacy_policy(request):
     """Render the Privacy Policy page."""
-    return render(request, "pages/privacy_policy.html")
+    return render_public_page(request, "pages/privacy_policy.html")
 
 
 @csrf_protect
@@ -214,12 +268,15 @@ def quick_lead_view(request):
 
         # Save email to the database as a new Lead or message
         try:
-            Lead.objects.create(
+            lead, created = intake_lead(
                 email=email, name="Anonymous"
             )  # Save email as "Anonymous"
-            messages.success(
-                request, "Thank you! Your email has been submitted successfully."
-            )
+            if created:
+                messages.success(
+                    request, "Thank you! Your email has been submitted successfully."
+                )
+            else:
+                messages.error(request, "This email has already been submitted.")
         except Exception as e:
             messages.error(request, "An error occurred. Please try again.")
 
@@ -266,7 +323,8 @@ def admin_signup(request):
 
 def submit_lead(request):
     """
-    Handles lead submissions from frontend, saves to database, and sends email confirmation.
+    Handles lead submissions from frontend, saves to database, and queues an email
+    confirmation.
     """
     if request.method == "POST":
         email = request.POST.get("email")
@@ -280,20 +338,18 @@ def submit_lead(request):
             messages.error(request, "Email is required.")
             return redirect("home")  # Redirect to landing page
 
-        # Check for duplicate email
-        if Lead.objects.filter(email=email).exists():
-            messages.error(request, "This email has already been submitted.")
-            return redirect("home")
-
         try:
-            # Save the lead to the database
-            Lead.objects.create(name=name, email=email, phone=phone)
+            # Save the lead; the unique email index rejects duplicates
+            lead, created = intake_lead(name=name, email=email, phone=phone)
+            if not created:
+                messages.error(request, "This email has already been submitted.")
+                return redirect("home")
 
-            # Send confirmation email
+            # Queue confirmation email
             subject = "Lead Submission Received"
             message = f"Dear {name},\n\nThank you for submitting your details. We'll contact you soon.\n\nPhone: {phone}"
             from_email = settings.DEFAULT_FROM_EMAIL
-            send_mail(subject, message, from_email, [email], fail_silently=True)
+            enqueue_mail(subject, message, from_email, [email])
 
             # Success message
             messages.success(
@@ -301,7 +357,7 @@ def submit_lead(request):
             )
             return redirect("home")  # Redirect back to landing page
         except Exception as e:
-            print(f"Error saving lead or sending email: {e}")
+            print(f"Error saving lead or queueing email: {e}")
             messages.error(request, "An error occurred. Please try again later.")
             return redirect("home")
 